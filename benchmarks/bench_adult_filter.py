@@ -0,0 +1,58 @@
+"""
+Compare the keyword automaton against the original per-keyword substring loop.
+
+Usage:
+    python -m benchmarks.bench_adult_filter [--emojis N] [--keywords N]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from benchmarks.synthetic import generate_catalog, generate_keywords
+from utils.keyword_matcher import KeywordMatcher
+
+def loop_match(keywords: List[str], emoji: Dict[str, Any]) -> Optional[str]:
+    """The original matcher: three substring checks per keyword."""
+    title = emoji.get("title", "").lower()
+    description = emoji.get("description", "").lower()
+    slug = emoji.get("slug", "").lower()
+    for keyword in keywords:
+        if keyword in title or keyword in description or keyword in slug:
+            return keyword
+    return None
+
+def automaton_match(matcher: KeywordMatcher, emoji: Dict[str, Any]) -> Optional[str]:
+    """The automaton matcher, scanning all three fields in one pass."""
+    text = "\0".join((emoji.get("title", ""), emoji.get("description", ""), emoji.get("slug", ""))).lower()
+    return matcher.find(text)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emojis", type=int, default=50000, help="Synthetic catalog size")
+    parser.add_argument("--keywords", type=int, nargs="+", default=[0, 500, 2000],
+                        help="Keyword list sizes to test (0 = shipped list only)")
+    args = parser.parse_args()
+    
+    shipped = [k.lower() for k in json.loads(Path("adult_keywords.json").read_text())]
+    emojis = generate_catalog(args.emojis, seed=1)
+    
+    print(f"{'keywords':>9} {'loop (s)':>10} {'automaton (s)':>14} {'speedup':>8}")
+    for size in args.keywords:
+        keywords = generate_keywords(shipped, size) if size else shipped
+        
+        start = time.perf_counter()
+        expected = [loop_match(keywords, emoji) is not None for emoji in emojis]
+        loop_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        actual = [automaton_match(matcher, emoji) is not None for emoji in emojis]
+        automaton_time = time.perf_counter() - start
+        
+        if expected != actual:
+            raise SystemExit("Automaton and loop disagree on adult verdicts")
+        print(f"{len(keywords):>9} {loop_time:>10.3f} {automaton_time:>14.3f} {loop_time / automaton_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare the compiled FilterPolicy against per-emoji config lookups.
+
+Usage:
+    python -m benchmarks.bench_filter_policy [--emojis N]
+"""
+import argparse
+import logging
+import re
+import time
+from typing import Dict, Any
+from benchmarks.synthetic import generate_catalog
+from utils.config_manager import ConfigManager
+from utils.emoji_filter import EmojiFilter
+
+def lookup_is_quality(config: ConfigManager, emoji: Dict[str, Any]) -> bool:
+    """The original quality check: dotted config lookups and re module calls for every emoji."""
+    min_faves = config.get("emoji_quality.min_favorites", 0)
+    if emoji.get("faves", 0) < min_faves:
+        return False
+    filesize = emoji.get("filesize", 0)
+    if filesize > 0:
+        min_size = config.get("emoji_quality.min_file_size", 100)
+        max_size = config.get("emoji_quality.max_file_size", 256000)
+        if filesize < min_size or filesize > max_size:
+            return False
+    title = emoji.get("title", "")
+    if len(title) < 2 or len(title) > 100:
+        return False
+    if not re.match(r'^[a-zA-Z0-9_\-\s]+$', title):
+        special_chars = len(re.findall(r'[^a-zA-Z0-9_\-\s]', title))
+        if special_chars > len(title) * 0.3:
+            return False
+    return True
+
+def best_of(runs: int, func) -> float:
+    """Run func several times and return the fastest time in seconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emojis", type=int, default=100000, help="Synthetic catalog size")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    
+    # Keep per-call log lines out of the timings
+    logging.disable(logging.INFO)
+    config = ConfigManager(settings_path=":memory:", legacy_settings_path=None)
+    emoji_filter = EmojiFilter(config)
+    policy = emoji_filter.policy
+    emojis = generate_catalog(args.emojis, seed=1)
+    
+    expected = [lookup_is_quality(config, emoji) for emoji in emojis]
+    actual = [policy.is_quality(emoji) for emoji in emojis]
+    if expected != actual:
+        raise SystemExit("Policy and config lookups disagree on quality verdicts")
+    
+    lookup_time = best_of(args.runs, lambda: [lookup_is_quality(config, emoji) for emoji in emojis])
+    policy_time = best_of(args.runs, lambda: [policy.is_quality(emoji) for emoji in emojis])
+    # A copy of the list takes the per-emoji path of filter_emojis rather than the catalog columns
+    subset = list(emojis)
+    filter_time = best_of(args.runs, lambda: emoji_filter.filter_emojis(subset, adult_filter=True))
+    
+    print(f"{args.emojis} emojis, {sum(actual)} pass the quality check")
+    print(f"{'quality check, config lookups':<32} {lookup_time:>8.3f} s")
+    print(f"{'quality check, compiled policy':<32} {policy_time:>8.3f} s ({lookup_time / policy_time:.1f}x)")
+    print(f"{'filter_emojis (per-emoji path)':<32} {filter_time:>8.3f} s")
+
+if __name__ == "__main__":
+    main()
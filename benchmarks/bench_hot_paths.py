@@ -0,0 +1,207 @@
+"""
+Time the filter, sort, trending, random, search and category hot paths on synthetic catalogs.
+
+Each case is run repeatedly and reported with throughput, latency
+percentiles and peak traced memory. Results can be saved as JSON and
+compared against an earlier run to spot regressions.
+
+Usage:
+    python -m benchmarks.bench_hot_paths [--sizes N ...] [--runs N] [--output FILE] [--compare FILE]
+"""
+import argparse
+import gc
+import json
+import logging
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from benchmarks.synthetic import generate_catalog, generate_categories
+from utils import vector_engine
+from utils.category_index import CategoryIndex
+from utils.config_manager import ConfigManager
+from utils.emoji_filter import EmojiFilter
+from utils.search_index import SearchIndex
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def measure(func: Callable[[], Any], runs: int, items: int) -> Dict[str, float]:
+    """
+    Time a function and trace its peak memory.
+    
+    Args:
+        func: Code under test
+        runs: Timed runs (after one warm-up run)
+        items: Emojis processed per run, for the throughput figure
+    
+    Returns:
+        Latency percentiles in milliseconds, throughput and peak memory in KiB
+    """
+    func()
+    times = []
+    gc.disable()
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    
+    # Memory is traced in a separate run, since tracing slows the code down
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    times.sort()
+    mean = sum(times) / len(times)
+    return {
+        "runs": runs,
+        "mean_ms": mean * 1000,
+        "p50_ms": percentile(times, 0.5) * 1000,
+        "p95_ms": percentile(times, 0.95) * 1000,
+        "p99_ms": percentile(times, 0.99) * 1000,
+        "ops_per_s": 1 / mean if mean else 0,
+        "items_per_s": items / mean if mean else 0,
+        "peak_kib": peak / 1024
+    }
+
+def build_cases(emojis: List[Dict[str, Any]], config: ConfigManager) -> List[Tuple[str, Callable[[], Any], int]]:
+    """
+    Set up the hot paths over one catalog.
+    
+    Returns:
+        (case name, function, emojis processed per call) tuples
+    """
+    categories = generate_categories()
+    emoji_filter = EmojiFilter(config)
+    category_index = CategoryIndex(categories, emojis)
+    emoji_filter.rebuild_catalog(emojis, category_index)
+    search_index = SearchIndex(emojis)
+    size = len(emojis)
+    
+    filtered = emoji_filter.filter_emojis(emojis, adult_filter=True)
+    # A copy is not the cached catalog list, so it takes the per-emoji paths
+    sample = emojis[:max(1, size // 10)]
+    
+    def original_category_counts():
+        """What /categories did per call before the category index existed."""
+        counts: Dict[Any, int] = {}
+        for emoji in emojis:
+            counts[emoji.get("category")] = counts.get(emoji.get("category"), 0) + 1
+        return sorted(((cat, counts.get(cat.get("id"), 0)) for cat in categories), key=lambda x: x[1], reverse=True)
+    
+    def categories_command():
+        """The per-call work of /categories."""
+        return [(cat, count, category_index.animated_count(cat.get("id"))) for cat, count in category_index.ranked()[:20]]
+    
+    return [
+        ("catalog.build", lambda: emoji_filter.rebuild_catalog(emojis, CategoryIndex(categories, emojis)), size),
+        ("category_index.build", lambda: CategoryIndex(categories, emojis), size),
+        ("search_index.build", lambda: SearchIndex(emojis), size),
+        ("filter_emojis.catalog", lambda: emoji_filter.filter_emojis(emojis, adult_filter=True), size),
+        ("filter_emojis.category", lambda: emoji_filter.filter_emojis(emojis, category=4, adult_filter=True), size),
+        ("filter_emojis.static_min_faves", lambda: emoji_filter.filter_emojis(
+            emojis, include_animated=False, adult_filter=True, min_favorites=5
+        ), size),
+        ("filter_emojis.query", lambda: emoji_filter.filter_emojis(
+            emojis, adult_filter=True, search_query="pepe"
+        ), size),
+        ("filter_emojis.per_emoji", lambda: emoji_filter.filter_emojis(list(sample), adult_filter=True), len(sample)),
+        ("sort_emojis.favorites", lambda: emoji_filter.sort_emojis(filtered, sort_by="favorites"), len(filtered)),
+        ("sort_emojis.title", lambda: emoji_filter.sort_emojis(filtered, sort_by="title"), len(filtered)),
+        ("sort_emojis.recent", lambda: emoji_filter.sort_emojis(filtered, sort_by="recent"), len(filtered)),
+        ("trending.top10", lambda: emoji_filter.get_trending_emojis(emojis, limit=10), size),
+        ("trending.category_top25", lambda: emoji_filter.get_trending_emojis(emojis, limit=25, category=4), size),
+        ("trending.per_emoji", lambda: emoji_filter.get_trending_emojis(list(sample), limit=10), len(sample)),
+        ("random.5", lambda: emoji_filter.get_random_emojis(emojis, count=5, guild_id=1), size),
+        ("search_index.search", lambda: search_index.search("pepe_cat"), size),
+        ("categories.original_count", original_category_counts, size),
+        ("categories.command", categories_command, size)
+    ]
+
+def git_commit() -> Optional[str]:
+    """Get the current commit, if running inside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: List[Dict[str, Any]], baseline_path: str):
+    """Print the p50 change of every case against an earlier results file."""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    previous = {(r["size"], r["case"]): r for r in baseline["results"]}
+    print(f"\nCompared with {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    print(f"{'size':>8} {'case':<34} {'p50 before':>11} {'p50 now':>10} {'change':>8}")
+    for result in results:
+        before = previous.get((result["size"], result["case"]))
+        if before is None or not before["p50_ms"]:
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1
+        print(
+            f"{result['size']:>8} {result['case']:<34} {before['p50_ms']:>9.3f}ms "
+            f"{result['p50_ms']:>8.3f}ms {change:>+7.0%}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="Catalog sizes")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per case")
+    parser.add_argument("--cases", nargs="+", help="Only run cases starting with these prefixes")
+    parser.add_argument("--seed", type=int, default=1, help="Catalog generator seed")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare with an earlier results file")
+    args = parser.parse_args()
+    
+    # Keep per-call log lines out of the timings
+    logging.disable(logging.INFO)
+    config = ConfigManager(settings_path=":memory:", legacy_settings_path=None)
+    
+    results = []
+    print(f"{'size':>8} {'case':<34} {'p50':>9} {'p95':>9} {'p99':>9} {'items/s':>12} {'peak':>10}")
+    for size in args.sizes:
+        emojis = generate_catalog(size, seed=args.seed)
+        for case, func, items in build_cases(emojis, config):
+            if args.cases and not any(case.startswith(prefix) for prefix in args.cases):
+                continue
+            # Builds are slow at large sizes; a few runs are enough for them
+            runs = max(3, args.runs // 5) if case.endswith(".build") else args.runs
+            stats = measure(func, runs, items)
+            results.append({"size": size, "case": case, **stats})
+            print(
+                f"{size:>8} {case:<34} {stats['p50_ms']:>7.3f}ms {stats['p95_ms']:>7.3f}ms "
+                f"{stats['p99_ms']:>7.3f}ms {stats['items_per_s']:>12,.0f} {stats['peak_kib']:>7.0f}KiB"
+            )
+    
+    if args.output:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "numpy": vector_engine.available(),
+                "seed": args.seed,
+                "runs": args.runs
+            },
+            "results": results
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}")
+    
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
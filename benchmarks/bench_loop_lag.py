@@ -0,0 +1,118 @@
+"""
+Measure event loop lag while backing up and restoring emojis.
+
+"before" replays the original cog code, which wrote and read the backup zip
+directly inside the coroutine; "after" goes through BackupStore, which does
+the disk work on its I/O pool. A ticker task records how late it wakes up.
+
+Usage:
+    python -m benchmarks.bench_loop_lag [--emojis N]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, List
+from utils.backup_store import BackupStore
+
+TICK = 0.001
+
+class FakeEmoji:
+    """The attributes of discord.Emoji that backups use."""
+    
+    def __init__(self, emoji_id: int, animated: bool):
+        self.id = emoji_id
+        self.name = f"emoji_{emoji_id}"
+        self.animated = animated
+        self.url = f"https://cdn.example/{emoji_id}"
+
+async def measure_lag(work) -> Dict[str, float]:
+    """Run work while a ticker records how late each tick fires."""
+    lags: List[float] = []
+    done = asyncio.Event()
+    
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+    
+    task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await task
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "p99_ms": lags[int(len(lags) * 0.99)] * 1000 if lags else 0,
+        "max_ms": lags[-1] * 1000 if lags else 0,
+        "mean_ms": statistics.mean(lags) * 1000 if lags else 0
+    }
+
+async def fetch_after_yield(images: Dict[str, bytes], url: str) -> bytes:
+    """Stand-in for a download: yields to the loop like a network read would."""
+    await asyncio.sleep(0)
+    return images[url]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emojis", type=int, default=500, help="Emojis in the backup")
+    args = parser.parse_args()
+    
+    rng = random.Random(0)
+    emojis = [FakeEmoji(100000 + i, rng.random() < 0.3) for i in range(args.emojis)]
+    # Random bytes behave like PNG/GIF data: already compressed
+    images = {emoji.url: rng.randbytes(rng.randint(20000, 256000)) for emoji in emojis}
+    
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            
+            async def before():
+                zip_path = root / "legacy_backup.zip"
+                with zipfile.ZipFile(zip_path, "w") as zipf:
+                    for emoji in emojis:
+                        data = await fetch_after_yield(images, emoji.url)
+                        ext = "gif" if emoji.animated else "png"
+                        zipf.writestr(f"{emoji.name}_{emoji.id}.{ext}", data)
+                zip_path.stat()
+                with zipfile.ZipFile(zip_path, "r") as zipf:
+                    for member in zipf.namelist():
+                        zipf.read(member)
+                        await asyncio.sleep(0)
+            
+            store = BackupStore(str(root / "store"))
+            
+            async def after():
+                await store.create_backup(1, "bench", emojis, lambda url: fetch_after_yield(images, url))
+                reader = await store.open_backup(1, "bench")
+                async with reader:
+                    stream = reader.stream()
+                    try:
+                        async for _ in stream:
+                            await asyncio.sleep(0)
+                    finally:
+                        await stream.aclose()
+            
+            results = {"before": await measure_lag(before), "after": await measure_lag(after)}
+            store.close()
+            return results
+    
+    results = asyncio.run(run())
+    total = sum(len(data) for data in images.values()) / 1024 / 1024
+    print(f"{args.emojis} emojis, {total:.1f} MB")
+    print(f"{'':>7} {'elapsed (s)':>12} {'mean lag (ms)':>14} {'p99 lag (ms)':>13} {'max lag (ms)':>13}")
+    for label, result in results.items():
+        print(
+            f"{label:>7} {result['elapsed']:>12.3f} {result['mean_ms']:>14.2f} "
+            f"{result['p99_ms']:>13.2f} {result['max_ms']:>13.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# End-to-end load test harness: a local emoji.gg stand-in, a fake Discord guild layer and a driver
@@ -0,0 +1,263 @@
+"""
+Replay concurrent command mixes against a local emoji.gg stand-in and fake guilds.
+
+The real cogs, caches, HTTP client and scheduler run unchanged; only
+emoji.gg (a local aiohttp server) and Discord (fake guilds enforcing emoji
+limits and answering 429s) are replaced. Every guild runs its own stream of
+commands, all guilds concurrently, and the end-to-end latency and
+throughput of each command are reported.
+
+Usage:
+    python -m benchmarks.loadtest.driver [--guilds N] [--commands N] [--mix upload=4,backup=2,...]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List
+from benchmarks.loadtest.fake_api import FakeEmojiApi
+from benchmarks.loadtest.fake_discord import FakeDiscord, FakeGuild, FakeInteraction
+from benchmarks.synthetic import COMMON_WORDS
+from cogs.backup_management import BackupManagement
+from cogs.emoji_management import EmojiManagement
+from cogs.emoji_search import EmojiSearch
+from utils.blob_cache import BlobCache
+from utils.config_manager import ConfigManager
+from utils.emoji_cache import EmojiCache
+from utils.emoji_filter import EmojiFilter
+from utils.emoji_scheduler import EmojiMutationScheduler
+from utils.guild_emoji_index import GuildEmojiIndex
+from utils.http_client import HttpClient
+from utils.metrics import LOOP_LAG, LoopLagMonitor
+from utils.query_cache import QueryCache
+
+COMMANDS = ("upload", "backup", "restore", "deleteall", "search")
+DEFAULT_MIX = "upload=4,backup=2,restore=1,deleteall=1,search=4"
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "command=weight,..." into a weight map."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(COMMANDS)
+    if unknown:
+        raise SystemExit(f"Unknown commands in mix: {', '.join(sorted(unknown))}")
+    return mix
+
+def build_bot(config: ConfigManager, workdir: str, args: argparse.Namespace) -> SimpleNamespace:
+    """Wire the bot's components the way main.py does, against the fake services."""
+    config.config.update({
+        "backups": {"path": f"{workdir}/backups", "io_workers": 2, "read_ahead": 4},
+        "blob_cache": {"path": f"{workdir}/blobs", "max_bytes": 256 * 1024 * 1024},
+        "rate_limits": {
+            "emoji_create": {"limit": args.scheduler_limit, "per": args.discord_window},
+            "emoji_delete": {"limit": args.scheduler_limit, "per": args.discord_window},
+            "global_per_second": args.global_limit,
+            "max_retries": 5
+        },
+        "random": {"seed": args.seed, "recent_memory": 50}
+    })
+    bot = SimpleNamespace(config=config)
+    bot.http_client = HttpClient.from_config(config)
+    bot.blob_cache = BlobCache.from_config(config)
+    bot.emoji_cache = EmojiCache(ttl=config.get("api.cache_ttl", 3600), http_client=bot.http_client)
+    bot.emoji_filter = EmojiFilter(config)
+    bot.query_cache = QueryCache.from_config(config)
+    bot.emoji_scheduler = EmojiMutationScheduler.from_config(config)
+    bot.guild_emojis = GuildEmojiIndex()
+    bot.emoji_cache.add_refresh_listener(bot.emoji_filter.prepare_catalog)
+    return bot
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Latency percentiles in seconds."""
+    ordered = sorted(latencies)
+    
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p50": pick(0.5),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1]
+    }
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    cdn_store: Dict[int, bytes] = {}
+    api = FakeEmojiApi(
+        catalog_size=args.catalog,
+        seed=args.seed,
+        api_latency=args.api_latency,
+        image_latency=args.image_latency,
+        api_error_rate=args.api_error_rate,
+        image_error_rate=args.image_error_rate,
+        cdn_store=cdn_store
+    )
+    api_url = await api.start()
+    fake_discord = FakeDiscord(
+        cdn_store,
+        api.cdn_url,
+        create_limit=args.discord_limit,
+        delete_limit=args.discord_limit,
+        window=args.discord_window,
+        latency=args.discord_latency,
+        seed=args.seed
+    )
+    
+    config = ConfigManager(settings_path=":memory:", legacy_settings_path=None)
+    config.config.setdefault("api", {})["base_url"] = api_url
+    workdir = tempfile.TemporaryDirectory(prefix="emoji-loadtest-")
+    bot = build_bot(config, workdir.name, args)
+    # Emoji changes reach the index through the update event, as from the gateway
+    fake_discord.listeners.append(lambda guild, before, after: bot.guild_emojis.on_emojis_update(guild, after))
+    
+    management = EmojiManagement(bot)
+    backups = BackupManagement(bot)
+    search = EmojiSearch(bot)
+    monitor = LoopLagMonitor(interval=0.05)
+    
+    latencies: Dict[str, List[float]] = {name: [] for name in COMMANDS}
+    failures: Dict[str, int] = {name: 0 for name in COMMANDS}
+    
+    async def timed(name: str, guild: FakeGuild, call: Callable[[FakeInteraction], Awaitable[Any]]):
+        interaction = FakeInteraction(guild)
+        start = time.perf_counter()
+        try:
+            await call(interaction)
+        except Exception as e:
+            logging.getLogger(__name__).error(f"{name} raised {e!r}")
+            failures[name] += 1
+        else:
+            if interaction.failed:
+                failures[name] += 1
+        latencies[name].append(time.perf_counter() - start)
+    
+    async def guild_worker(guild: FakeGuild, rng: random.Random):
+        names: List[str] = []
+        commands = list(mix)
+        weights = [mix[name] for name in commands]
+        for i in range(args.commands):
+            name = rng.choices(commands, weights)[0]
+            # Backups and deletions need emojis, restores need a backup
+            if name in ("backup", "deleteall") and not guild.emojis:
+                name = "upload"
+            if name == "restore" and not names:
+                name = "backup" if guild.emojis else "upload"
+            
+            if name == "upload":
+                await timed(name, guild, lambda it: management.upload_emojis.callback(
+                    management, it, amount=args.upload_amount
+                ))
+            elif name == "backup":
+                backup_name = f"lt{i}"
+                names.append(backup_name)
+                await timed(name, guild, lambda it: backups.backup_emojis.callback(backups, it, backup_name))
+            elif name == "restore":
+                backup_name = rng.choice(names) if names else "missing"
+                await timed(name, guild, lambda it: backups.upload_backup.callback(backups, it, backup_name))
+            elif name == "deleteall":
+                await timed(name, guild, lambda it: backups.delete_all_emojis.callback(backups, it))
+            elif name == "search":
+                query = rng.choice(COMMON_WORDS)
+                await timed(name, guild, lambda it: search.search.callback(search, it, query))
+    
+    await bot.http_client.start()
+    monitor.start()
+    try:
+        # Warm the catalog so the first commands measure steady state, like a bot restored from its snapshot
+        await bot.emoji_cache.refresh_all(api_url)
+        guilds = [fake_discord.add_guild(1000 + i, premium_tier=args.tier) for i in range(args.guilds)]
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            guild_worker(guild, random.Random(args.seed * 7919 + guild.id)) for guild in guilds
+        ))
+        elapsed = time.perf_counter() - start
+    finally:
+        await monitor.close()
+        await bot.emoji_scheduler.close()
+        await bot.http_client.close()
+        backups.backup_store.close()
+        await api.close()
+        workdir.cleanup()
+    
+    total = sum(len(values) for values in latencies.values())
+    loop_lag = LOOP_LAG.percentiles((0.5, 0.99))
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "elapsed_seconds": elapsed,
+        "commands": total,
+        "commands_per_second": total / elapsed if elapsed else 0,
+        "emojis_created_per_second": fake_discord.stats["created"] / elapsed if elapsed else 0,
+        "per_command": {
+            name: {"count": len(values), "failed": failures[name], **summarize(values)}
+            for name, values in latencies.items() if values
+        },
+        "discord": fake_discord.stats,
+        "api": api.get_stats(),
+        "http": bot.http_client.get_stats(),
+        "scheduler": bot.emoji_scheduler.get_stats(),
+        "loop_lag": {"p50": loop_lag[0], "p99": loop_lag[1]} if loop_lag else None
+    }
+
+def print_report(report: Dict[str, Any]):
+    print(
+        f"{report['commands']} commands in {report['elapsed_seconds']:.1f}s "
+        f"({report['commands_per_second']:.2f}/s), "
+        f"{report['emojis_created_per_second']:.2f} emojis created/s"
+    )
+    print(f"{'command':<10} {'count':>6} {'failed':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, stats in report["per_command"].items():
+        print(
+            f"{name:<10} {stats['count']:>6} {stats['failed']:>7} {stats['p50']:>8.2f}s "
+            f"{stats['p95']:>8.2f}s {stats['p99']:>8.2f}s {stats['max']:>8.2f}s"
+        )
+    discord_stats = report["discord"]
+    print(
+        f"Discord: {discord_stats['created']} created, {discord_stats['deleted']} deleted, "
+        f"{discord_stats['rejected']} rejected, {discord_stats['rate_limited']} rate limited (429)"
+    )
+    print(f"emoji.gg stand-in: {report['api']['requests']}, {report['api']['errors']} errors")
+    if report["loop_lag"]:
+        print(f"Loop lag: p50 {report['loop_lag']['p50'] * 1000:.1f}ms, p99 {report['loop_lag']['p99'] * 1000:.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=10, help="Concurrent guilds")
+    parser.add_argument("--commands", type=int, default=10, help="Commands run by each guild, one after another")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Command weights (upload, backup, restore, deleteall, search)")
+    parser.add_argument("--upload-amount", type=int, default=20, help="Emojis per /uploademojis")
+    parser.add_argument("--catalog", type=int, default=5000, help="Emojis served by the emoji.gg stand-in")
+    parser.add_argument("--tier", type=int, default=3, choices=[0, 1, 2, 3], help="Server boost tier (emoji slots)")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="emoji.gg API latency in seconds")
+    parser.add_argument("--image-latency", type=float, default=0.01, help="Image download latency in seconds")
+    parser.add_argument("--api-error-rate", type=float, default=0.0, help="Fraction of API requests failing")
+    parser.add_argument("--image-error-rate", type=float, default=0.01, help="Fraction of image downloads failing")
+    parser.add_argument("--discord-latency", type=float, default=0.02, help="Discord emoji call latency in seconds")
+    parser.add_argument("--discord-limit", type=int, default=10, help="Emoji calls Discord allows per guild per window")
+    parser.add_argument("--discord-window", type=float, default=1.0, help="Discord rate limit window in seconds")
+    parser.add_argument("--scheduler-limit", type=int, help="Calls per window the bot plans for (default: --discord-limit)")
+    parser.add_argument("--global-limit", type=int, default=50, help="Bot-wide emoji calls per second")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the catalog, latencies and command mix")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+    if args.scheduler_limit is None:
+        args.scheduler_limit = args.discord_limit
+    
+    # Per-command log lines and expected 429 warnings would dominate the output
+    logging.disable(logging.WARNING)
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote report to {args.output}")
+
+if __name__ == "__main__":
+    main()
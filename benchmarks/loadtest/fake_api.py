@@ -0,0 +1,180 @@
+import asyncio
+import json
+import random
+import struct
+import zlib
+from typing import Any, Dict, MutableMapping, Optional
+from aiohttp import web
+from benchmarks.synthetic import generate_catalog, generate_categories
+
+def fake_image(emoji_id: int, size: int, animated: bool) -> bytes:
+    """
+    Build deterministic image bytes of roughly the given size.
+    
+    The bytes start with a real PNG or GIF signature so content sniffing
+    (animated or not) behaves as with real images.
+    """
+    header = b"GIF89a" if animated else b"\x89PNG\r\n\x1a\n"
+    rng = random.Random(emoji_id)
+    body = rng.randbytes(max(0, size - len(header) - 4))
+    return header + body + struct.pack(">I", zlib.crc32(body))
+
+class FakeEmojiApi:
+    """
+    Local stand-in for emoji.gg, served with aiohttp.
+    
+    Serves the emoji list at /api, categories at /api?request=categories,
+    packs at /api/packs and images at /images/<id>.<ext>, with configurable
+    latency and error rates. Emojis created in fake guilds are served at
+    /cdn/<id> so backups can download them like Discord CDN URLs.
+    """
+    
+    def __init__(
+        self,
+        catalog_size: int = 5000,
+        seed: int = 1,
+        api_latency: float = 0.05,
+        image_latency: float = 0.01,
+        jitter: float = 0.5,
+        api_error_rate: float = 0.0,
+        image_error_rate: float = 0.01,
+        oversized_rate: float = 0.02,
+        cdn_store: Optional[MutableMapping[int, bytes]] = None
+    ):
+        """
+        Generate the catalog.
+        
+        Args:
+            catalog_size: Number of emojis in the fake catalog
+            seed: Seed for the catalog, latencies and errors
+            api_latency: Mean latency of API responses in seconds
+            image_latency: Mean latency of image responses in seconds
+            jitter: Latencies vary uniformly by this fraction around the mean
+            api_error_rate: Fraction of API requests answered with a 500
+            image_error_rate: Fraction of image requests answered with a 500
+            oversized_rate: Fraction of images larger than Discord's 256KB limit
+            cdn_store: Emoji ID -> bytes of emojis created in fake guilds
+        """
+        self.api_latency = api_latency
+        self.image_latency = image_latency
+        self.jitter = jitter
+        self.api_error_rate = api_error_rate
+        self.image_error_rate = image_error_rate
+        self.cdn_store = cdn_store if cdn_store is not None else {}
+        self.rng = random.Random(seed)
+        self.base_url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+        
+        self.emojis = generate_catalog(catalog_size, seed=seed)
+        self.categories = generate_categories()
+        self.packs = [
+            {"id": i, "name": f"Pack {i}", "amount": 0, "emojis": []} for i in range(1, 11)
+        ]
+        # Image sizes: mostly small PNG/GIF files, a few beyond the limit
+        self._image_sizes: Dict[int, int] = {}
+        for emoji in self.emojis:
+            if self.rng.random() < oversized_rate:
+                size = self.rng.randint(260000, 400000)
+            else:
+                size = min(250000, int(self.rng.lognormvariate(9.5, 1.0)) + 200)
+            self._image_sizes[emoji["id"]] = size
+        self._emojis_body = json.dumps(self.emojis).encode()
+        
+        self.requests: Dict[str, int] = {"api": 0, "categories": 0, "packs": 0, "images": 0, "cdn": 0}
+        self.errors = 0
+        self.bytes_sent = 0
+    
+    async def _delay(self, mean: float):
+        if mean > 0:
+            await asyncio.sleep(mean * self.rng.uniform(1 - self.jitter, 1 + self.jitter))
+    
+    def _fail(self, rate: float) -> bool:
+        if rate > 0 and self.rng.random() < rate:
+            self.errors += 1
+            return True
+        return False
+    
+    def _json(self, body: Any) -> web.Response:
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.bytes_sent += len(data)
+        return web.Response(body=data, content_type="application/json")
+    
+    async def _api(self, request: web.Request) -> web.Response:
+        kind = "categories" if request.query.get("request") == "categories" else "api"
+        self.requests[kind] += 1
+        await self._delay(self.api_latency)
+        if self._fail(self.api_error_rate):
+            return web.Response(status=500, text="Internal Server Error")
+        return self._json(self.categories if kind == "categories" else self._emojis_body)
+    
+    async def _packs(self, request: web.Request) -> web.Response:
+        self.requests["packs"] += 1
+        await self._delay(self.api_latency)
+        if self._fail(self.api_error_rate):
+            return web.Response(status=500, text="Internal Server Error")
+        return self._json(self.packs)
+    
+    async def _image(self, request: web.Request) -> web.Response:
+        self.requests["images"] += 1
+        emoji_id = int(request.match_info["emoji_id"])
+        size = self._image_sizes.get(emoji_id)
+        if size is None:
+            return web.Response(status=404, text="Not Found")
+        await self._delay(self.image_latency)
+        if self._fail(self.image_error_rate):
+            return web.Response(status=500, text="Internal Server Error")
+        animated = request.match_info["ext"] == "gif"
+        data = fake_image(emoji_id, size, animated)
+        self.bytes_sent += len(data)
+        return web.Response(body=data, content_type="image/gif" if animated else "image/png")
+    
+    async def _cdn(self, request: web.Request) -> web.Response:
+        self.requests["cdn"] += 1
+        data = self.cdn_store.get(int(request.match_info["emoji_id"]))
+        if data is None:
+            return web.Response(status=404, text="Not Found")
+        await self._delay(self.image_latency)
+        self.bytes_sent += len(data)
+        return web.Response(body=data, content_type="image/png")
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start serving.
+        
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+        
+        Returns:
+            The API base URL (what the bot's api.base_url would be)
+        """
+        app = web.Application()
+        app.router.add_get("/api", self._api)
+        app.router.add_get("/api/packs", self._packs)
+        app.router.add_get("/images/{emoji_id:\\d+}.{ext}", self._image)
+        app.router.add_get("/cdn/{emoji_id:\\d+}", self._cdn)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        port = self._runner.addresses[0][1]
+        root = f"http://{host}:{port}"
+        self.base_url = f"{root}/api"
+        for emoji in self.emojis:
+            ext = "gif" if emoji["image"].endswith(".gif") else "png"
+            emoji["image"] = f"{root}/images/{emoji['id']}.{ext}"
+        self._emojis_body = json.dumps(self.emojis).encode()
+        return self.base_url
+    
+    def cdn_url(self, emoji_id: int) -> str:
+        """URL of an emoji created in a fake guild."""
+        return f"{self.base_url[:-len('/api')]}/cdn/{emoji_id}"
+    
+    async def close(self):
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request statistics."""
+        return {"requests": dict(self.requests), "errors": self.errors, "bytes_sent": self.bytes_sent}
@@ -0,0 +1,275 @@
+import asyncio
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, MutableMapping, Optional
+import discord
+
+# Emoji slots per type (static and animated each) by server boost tier
+EMOJI_LIMITS = {0: 50, 1: 100, 2: 150, 3: 250}
+MAX_EMOJI_SIZE = 256 * 1024
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9_]{2,32}$")
+
+def _http_error(status: int, code: int, message: str, cls=discord.HTTPException, **extra) -> discord.HTTPException:
+    """Build the exception discord.py raises for an error response."""
+    reasons = {400: "Bad Request", 403: "Forbidden", 404: "Not Found", 429: "Too Many Requests"}
+    response = SimpleNamespace(status=status, reason=reasons.get(status, "Error"))
+    error = cls(response, {"code": code, "message": message, **extra})
+    for key, value in extra.items():
+        setattr(error, key, value)
+    return error
+
+class _Bucket:
+    """Discord-side rate limit of one route in one guild: limit calls per window, reset all at once."""
+    
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = 0.0
+    
+    def take(self) -> Optional[float]:
+        """Take a call; returns None if allowed, or the seconds to wait (a 429) if not."""
+        now = time.monotonic()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        if self.remaining <= 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return None
+
+class FakeEmoji:
+    """A guild emoji with the attributes and methods the cogs use."""
+    
+    def __init__(self, guild: "FakeGuild", emoji_id: int, name: str, animated: bool, url: str):
+        self.guild = guild
+        self.guild_id = guild.id
+        self.id = emoji_id
+        self.name = name
+        self.animated = animated
+        self.url = url
+    
+    async def delete(self, *, reason: Optional[str] = None):
+        await self.guild._delete_emoji(self)
+    
+    def __str__(self) -> str:
+        return f"<{'a' if self.animated else ''}:{self.name}:{self.id}>"
+
+class FakeGuild:
+    """
+    A guild whose emoji endpoints behave like Discord's.
+    
+    Enforces the per-tier static/animated slot limits, name and size
+    validation, and per-route rate limits answered with 429s. Every change
+    fires the emoji update listeners, like the gateway event.
+    """
+    
+    def __init__(self, discord_state: "FakeDiscord", guild_id: int, premium_tier: int = 0):
+        self.state = discord_state
+        self.id = guild_id
+        self.name = f"Load test guild {guild_id}"
+        self.premium_tier = premium_tier
+        self.emoji_limit = EMOJI_LIMITS[premium_tier]
+        self.emojis: List[FakeEmoji] = []
+        self._buckets = {
+            "create": _Bucket(discord_state.create_limit, discord_state.window),
+            "delete": _Bucket(discord_state.delete_limit, discord_state.window)
+        }
+    
+    def _rate_limit(self, route: str):
+        retry_after = self._buckets[route].take()
+        if retry_after is not None:
+            self.state.stats["rate_limited"] += 1
+            raise _http_error(429, 0, "You are being rate limited.", retry_after=retry_after)
+    
+    def _changed(self, before: List[FakeEmoji]):
+        after = list(self.emojis)
+        for listener in self.state.listeners:
+            listener(self, before, after)
+    
+    async def create_custom_emoji(
+        self,
+        *,
+        name: str,
+        image: bytes,
+        roles: Any = None,
+        reason: Optional[str] = None
+    ) -> FakeEmoji:
+        await self.state.delay()
+        self._rate_limit("create")
+        if not NAME_PATTERN.match(name):
+            self.state.stats["rejected"] += 1
+            raise _http_error(400, 50035, "Invalid Form Body (name)")
+        if len(image) > MAX_EMOJI_SIZE:
+            self.state.stats["rejected"] += 1
+            raise _http_error(400, 50045, "File cannot be larger than 256.0 kb.")
+        animated = image.startswith(b"GIF8")
+        if sum(1 for emoji in self.emojis if emoji.animated == animated) >= self.emoji_limit:
+            self.state.stats["rejected"] += 1
+            raise _http_error(400, 30008, f"Maximum number of emojis reached ({self.emoji_limit})")
+        
+        emoji_id = self.state.next_id()
+        self.state.cdn_store[emoji_id] = image
+        emoji = FakeEmoji(self, emoji_id, name, animated, self.state.url_for(emoji_id))
+        before = list(self.emojis)
+        self.emojis.append(emoji)
+        self.state.stats["created"] += 1
+        self._changed(before)
+        return emoji
+    
+    async def _delete_emoji(self, emoji: FakeEmoji):
+        await self.state.delay()
+        self._rate_limit("delete")
+        if emoji not in self.emojis:
+            raise _http_error(404, 10014, "Unknown Emoji", cls=discord.NotFound)
+        before = list(self.emojis)
+        self.emojis.remove(emoji)
+        self.state.cdn_store.pop(emoji.id, None)
+        self.state.stats["deleted"] += 1
+        self._changed(before)
+
+class FakeDiscord:
+    """Shared state of the fake guilds: emoji IDs, stored images, rate limits, latency and listeners."""
+    
+    def __init__(
+        self,
+        cdn_store: MutableMapping[int, bytes],
+        url_for: Callable[[int], str],
+        create_limit: int = 30,
+        delete_limit: int = 30,
+        window: float = 60,
+        latency: float = 0.05,
+        jitter: float = 0.5,
+        seed: int = 1
+    ):
+        """
+        Initialize the fake Discord.
+        
+        Args:
+            cdn_store: Emoji ID -> image bytes, served by the fake API's /cdn route
+            url_for: Builds an emoji's CDN URL from its ID
+            create_limit: Emoji creations Discord allows per guild per window
+            delete_limit: Emoji deletions Discord allows per guild per window
+            window: Rate limit window in seconds
+            latency: Mean latency of an emoji API call in seconds
+            jitter: Latencies vary uniformly by this fraction around the mean
+            seed: Seed for the latencies
+        """
+        self.cdn_store = cdn_store
+        self.url_for = url_for
+        self.create_limit = create_limit
+        self.delete_limit = delete_limit
+        self.window = window
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.guilds: Dict[int, FakeGuild] = {}
+        self.listeners: List[Callable[[FakeGuild, List[FakeEmoji], List[FakeEmoji]], None]] = []
+        self.stats = {"created": 0, "deleted": 0, "rejected": 0, "rate_limited": 0}
+        self._next_id = 900000000000000000
+    
+    def next_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+    
+    async def delay(self):
+        if self.latency > 0:
+            await asyncio.sleep(self.latency * self.rng.uniform(1 - self.jitter, 1 + self.jitter))
+    
+    def add_guild(self, guild_id: int, premium_tier: int = 0) -> FakeGuild:
+        """Create a guild."""
+        guild = self.guilds[guild_id] = FakeGuild(self, guild_id, premium_tier)
+        return guild
+
+class FakeMessage:
+    """A sent message that can be edited."""
+    
+    def __init__(self, interaction: "FakeInteraction", content: Optional[str], embed: Optional[discord.Embed]):
+        self.interaction = interaction
+        self.content = content
+        self.embed = embed
+    
+    async def edit(self, *, content: Optional[str] = None, embed: Optional[discord.Embed] = None, **kwargs):
+        if content is not None:
+            self.content = content
+        if embed is not None:
+            self.embed = embed
+        self.interaction._record(content, embed)
+
+class _FakeResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self._done = False
+    
+    def is_done(self) -> bool:
+        return self._done
+    
+    async def defer(self, **kwargs):
+        self._done = True
+    
+    async def send_message(
+        self,
+        content: Optional[str] = None,
+        *,
+        embed: Optional[discord.Embed] = None,
+        view: Optional[discord.ui.View] = None,
+        **kwargs
+    ):
+        self._done = True
+        self.interaction.original = FakeMessage(self.interaction, content, embed)
+        self.interaction._record(content, embed)
+        if view is not None and hasattr(view, "value"):
+            # The invoking user confirms right away
+            view.value = self.interaction.confirm
+            view.stop()
+
+class _FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+    
+    async def send(self, content: Optional[str] = None, *, embed: Optional[discord.Embed] = None, **kwargs) -> FakeMessage:
+        self.interaction._record(content, embed)
+        return FakeMessage(self.interaction, content, embed)
+
+class FakeInteraction:
+    """The parts of discord.Interaction the cogs use, recording every message sent."""
+    
+    def __init__(self, guild: FakeGuild, manage_emojis: bool = True, confirm: bool = True):
+        """
+        Create an interaction.
+        
+        Args:
+            guild: Guild the command runs in
+            manage_emojis: Whether the invoking member has Manage Emojis
+            confirm: Answer to confirmation prompts
+        """
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = SimpleNamespace(
+            id=1, name="loadtest", guild_permissions=SimpleNamespace(manage_emojis=manage_emojis)
+        )
+        self.confirm = confirm
+        self.extras: Dict[str, Any] = {}
+        self.response = _FakeResponse(self)
+        self.followup = _FakeFollowup(self)
+        self.original: Optional[FakeMessage] = None
+        self.messages: List[str] = []
+    
+    def _record(self, content: Optional[str], embed: Optional[discord.Embed]):
+        parts = [content or ""]
+        if embed is not None:
+            parts += [embed.title or "", embed.description or ""]
+        self.messages.append("\n".join(part for part in parts if part))
+    
+    async def edit_original_response(self, *, content: Optional[str] = None, embed: Any = None, **kwargs):
+        if self.original is not None:
+            await self.original.edit(content=content, embed=embed)
+        else:
+            self._record(content, embed)
+    
+    @property
+    def failed(self) -> bool:
+        """Whether the command answered with an error."""
+        return any(message.startswith("❌") for message in self.messages)
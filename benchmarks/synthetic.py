@@ -0,0 +1,108 @@
+import random
+from typing import Dict, List, Any
+
+# Vocabulary roughly following the distribution of emoji.gg titles
+COMMON_WORDS = [
+    "pepe", "cat", "dog", "blob", "think", "sad", "happy", "cry", "laugh", "wave",
+    "heart", "fire", "cool", "dance", "party", "angry", "love", "hype", "clap", "yes",
+    "no", "ok", "wow", "lol", "kek", "pog", "sip", "nod", "shrug", "salute"
+]
+RARE_WORDS = [
+    "anime", "girl", "boy", "frog", "gaming", "minecraft", "among", "cursed", "vibe",
+    "uwu", "owo", "bonk", "cozy", "sleepy", "rainbow", "spin", "peek", "pat", "hug"
+]
+DESCRIPTION_WORDS = [
+    "a", "the", "emoji", "for", "your", "server", "cute", "funny", "animated", "custom",
+    "reaction", "meme", "discord", "use", "when", "you", "are", "very", "so", "with"
+]
+ADULT_WORDS = ["nsfw", "sexy", "lewd", "hentai", "18+", "nude"]
+CATEGORY_NAMES = [
+    "Original Style", "TV / Movie", "Meme", "Anime", "Celebrity", "Blobs", "Thinking",
+    "Animated", "NSFW", "Gaming", "Letters", "Other", "Pepe", "Logos", "Cute", "Utility",
+    "Animals", "Holidays", "Among Us", "Minecraft", "Halloween", "Christmas", "Valorant",
+    "Roblox", "Pride"
+]
+
+# Word popularity follows a Zipf-like curve: a few words appear in most titles
+COMMON_WEIGHTS = [1 / rank for rank in range(1, len(COMMON_WORDS) + 1)]
+RARE_WEIGHTS = [1 / rank for rank in range(1, len(RARE_WORDS) + 1)]
+# Category sizes are skewed the same way
+CATEGORY_WEIGHTS = [1 / rank ** 0.8 for rank in range(1, len(CATEGORY_NAMES) + 1)]
+
+def _title(rng: random.Random, index: int) -> str:
+    """Build a synthetic emoji title."""
+    words = rng.choices(COMMON_WORDS, COMMON_WEIGHTS)
+    if rng.random() < 0.6:
+        words += rng.choices(RARE_WORDS, RARE_WEIGHTS)
+    title = rng.choice(["_", "", "-"]).join(words)
+    if rng.random() < 0.3:
+        title += str(index % 1000)
+    if rng.random() < 0.03:
+        # A few gibberish titles that the quality filter should reject
+        title += "".join(rng.choice("★☆✿❀♥♡") for _ in range(rng.randint(8, 20)))
+    return title
+
+def generate_catalog(size: int, seed: int = 0, adult_rate: float = 0.02) -> List[Dict[str, Any]]:
+    """
+    Generate a deterministic emoji.gg-shaped catalog.
+    
+    Args:
+        size: Number of emojis
+        seed: Random seed
+        adult_rate: Fraction of emojis containing an adult keyword
+    
+    Returns:
+        List of emoji dictionaries shaped like the emoji.gg /api response
+    """
+    rng = random.Random(seed)
+    emojis = []
+    for index in range(size):
+        title = _title(rng, index)
+        description = " ".join(rng.choice(DESCRIPTION_WORDS) for _ in range(rng.randint(0, 12)))
+        if rng.random() < adult_rate:
+            description += " " + rng.choice(ADULT_WORDS)
+        animated = rng.random() < 0.25
+        emoji_id = 100000 + index
+        emojis.append({
+            "id": emoji_id,
+            "title": title,
+            "slug": f"{emoji_id}-{title.lower()}",
+            "image": f"https://cdn3.emoji.gg/emojis/{emoji_id}-{title}.{'gif' if animated else 'png'}",
+            "description": description,
+            "category": rng.choices(range(1, len(CATEGORY_NAMES) + 1), CATEGORY_WEIGHTS)[0],
+            "license": "0",
+            "source": "",
+            "faves": int(rng.paretovariate(1.2)) - 1,
+            "submitted_by": f"user{rng.randint(1, 5000)}",
+            "width": 128,
+            "height": 128,
+            "filesize": rng.randint(0, 300000) if rng.random() < 0.9 else 0
+        })
+    return emojis
+
+def generate_categories() -> List[Dict[str, Any]]:
+    """
+    Generate the category list matching generate_catalog's category IDs.
+    
+    Returns:
+        List of category dictionaries shaped like the emoji.gg /api?request=categories response
+    """
+    return [{"id": i, "name": name} for i, name in enumerate(CATEGORY_NAMES, start=1)]
+
+def generate_keywords(base: List[str], size: int, seed: int = 0) -> List[str]:
+    """
+    Pad a keyword list with synthetic keywords up to the given size.
+    
+    Args:
+        base: Real keywords to keep
+        size: Target keyword count
+        seed: Random seed
+    
+    Returns:
+        Keyword list of the requested size
+    """
+    rng = random.Random(seed)
+    keywords = list(base)
+    while len(keywords) < size:
+        keywords.append("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10))))
+    return keywords
@@ -1,7 +1,9 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from utils.logger import setup_logger
+from utils.command_tree import COMMAND_DURATION
+from utils.logger import get_log_stats, setup_logger
+from utils.metrics import LOOP_LAG
 
 logger = setup_logger(__name__)
 
@@ -37,6 +39,31 @@ class Admin(commands.Cog):
         )
         logger.info(f"Cache cleared by {interaction.user} in guild {interaction.guild.id}")
     
+    @app_commands.command(name="reloadconfig", description="Reload config.json (bot owner only)")
+    async def reload_config(self, interaction: discord.Interaction):
+        """Reload the global configuration; filter policies and cached results are rebuilt on next use."""
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message(
+                "❌ Only the bot owner can reload the configuration.",
+                ephemeral=True
+            )
+            return
+        
+        if not self.config.reload_config():
+            await interaction.response.send_message(
+                "❌ Could not read config.json; the current configuration is kept.",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.send_message(
+            f"✅ Configuration reloaded (version {self.config.version}). "
+            "Filter settings apply to the next commands; connection pools, rate limits "
+            "and storage paths need a restart.",
+            ephemeral=True
+        )
+        logger.info(f"Config reloaded by {interaction.user}")
+    
     @app_commands.command(name="stats", description="Show bot statistics")
     async def stats(self, interaction: discord.Interaction):
         """Show bot statistics."""
@@ -57,6 +84,11 @@ class Admin(commands.Cog):
         if emojis_cached:
             cache_info += f"Emojis: {emoji_count}\n"
             cache_info += f"Age: {int(emoji_age)}s"
+        refresh_seconds = cache_stats["emojis"]["last_refresh_seconds"]
+        if refresh_seconds is not None:
+            cache_info += f"\nLast refresh: {refresh_seconds:.2f}s"
+        if cache_stats["emojis"]["refreshing"]:
+            cache_info += "\n🔄 Refreshing"
         
         embed.add_field(
             name="🗄️ Cache Status",
@@ -71,10 +103,82 @@ class Admin(commands.Cog):
             inline=True
         )
         
+        # HTTP pool stats
+        http_stats = self.bot.http_client.get_stats()
+        embed.add_field(
+            name="🌐 HTTP",
+            value=(
+                f"In flight: {http_stats['in_flight']}/{http_stats['pool_size']}\n"
+                f"Requests: {http_stats['requests']}\n"
+                f"Errors: {http_stats['errors']}\n"
+                f"Error responses: {http_stats['error_responses']}"
+            ),
+            inline=True
+        )
+        
+        # Image cache stats
+        blob_stats = self.bot.blob_cache.get_stats()
+        embed.add_field(
+            name="🖼️ Image Cache",
+            value=(
+                f"Hit rate: {blob_stats['hit_rate'] * 100:.1f}%\n"
+                f"Saved: {blob_stats['bytes_saved'] / 1024:.1f} KB\n"
+                f"Size: {blob_stats['bytes'] / 1024 / 1024:.1f} MB"
+            ),
+            inline=True
+        )
+        
+        # Query result cache stats
+        query_stats = self.bot.query_cache.get_stats()
+        embed.add_field(
+            name="🔁 Query Cache",
+            value=(
+                f"Hit rate: {query_stats['hit_rate'] * 100:.1f}%\n"
+                f"Entries: {query_stats['entries']}/{query_stats['max_entries']}\n"
+                f"Invalidations: {query_stats['invalidations']}"
+            ),
+            inline=True
+        )
+        
+        # Logging stats
+        log_stats = get_log_stats()
+        embed.add_field(
+            name="📝 Logging",
+            value=(
+                f"Records: {log_stats['queued']}\n"
+                f"Sampled: {log_stats['sampled']}\n"
+                f"Dropped: {log_stats['dropped']}"
+            ),
+            inline=True
+        )
+        
+        # Command latency percentiles (recent calls), busiest commands first
+        commands_by_count = sorted(
+            COMMAND_DURATION.label_sets(),
+            key=lambda labels: COMMAND_DURATION.count(**labels),
+            reverse=True
+        )
+        latency_lines = []
+        for labels in commands_by_count[:5]:
+            p50, p95, p99 = COMMAND_DURATION.percentiles(**labels)
+            status = "" if labels["status"] == "ok" else f" ({labels['status']})"
+            latency_lines.append(
+                f"`/{labels['command']}`{status}: {p50 * 1000:.0f} / {p95 * 1000:.0f} / {p99 * 1000:.0f} ms"
+            )
+        embed.add_field(
+            name="⏱️ Command Latency (p50 / p95 / p99)",
+            value="\n".join(latency_lines) or "No commands yet",
+            inline=False
+        )
+        
         # Bot stats
+        bot_info = f"Latency: {round(self.bot.latency * 1000)}ms"
+        loop_lag = LOOP_LAG.percentiles((0.5, 0.99))
+        if loop_lag:
+            bot_info += f"\nLoop lag: {loop_lag[0] * 1000:.1f} / {loop_lag[1] * 1000:.1f} ms (p50 / p99)"
         embed.add_field(
             name="🤖 Bot Info",
-            value=f"Latency: {round(self.bot.latency * 1000)}ms",
+            value=bot_info,
             inline=True
         )
         
@@ -1,25 +1,31 @@
+import asyncio
 import discord
 from discord.ext import commands
 from discord import app_commands
-import os
-import zipfile
-import requests
-from io import BytesIO
 from datetime import datetime
-from pathlib import Path
+from utils.backup_store import BackupStore
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-BACKUP_FOLDER = "emoji_backups"
-
 class BackupManagement(commands.Cog):
     """Commands for backing up and restoring emojis."""
     
     def __init__(self, bot):
         self.bot = bot
-        self.backup_folder = Path(BACKUP_FOLDER)
-        self.backup_folder.mkdir(exist_ok=True)
+        self.http_client = bot.http_client
+        self.emoji_scheduler = bot.emoji_scheduler
+        self.blob_cache = bot.blob_cache
+        self.backup_store = BackupStore.from_config(bot.config)
+        # (guild ID, backup name) of restores in progress
+        self._active_restores = set()
+    
+    async def cog_unload(self):
+        self.backup_store.close()
+    
+    async def _fetch_emoji(self, url: str) -> bytes:
+        """Download an emoji image through the image cache."""
+        return await self.blob_cache.get_or_fetch(url, self.http_client.download_image)
     
     @app_commands.command(name="backup", description="Backup all server emojis")
     @app_commands.describe(name="Name for this backup")
@@ -35,37 +41,29 @@ class BackupManagement(commands.Cog):
             await interaction.followup.send("❌ No custom emojis to back up in this server.")
             return
         
+        if not self.backup_store.validate_name(name):
+            await interaction.followup.send(f"❌ `{name}` is not a valid backup name.")
+            return
+        
         try:
-            # Create server backup folder
-            server_backup_folder = self.backup_folder / str(guild.id)
-            server_backup_folder.mkdir(exist_ok=True)
-            
-            # Create zip file
-            zip_path = server_backup_folder / f"{name}_backup.zip"
-            
-            with zipfile.ZipFile(zip_path, "w") as zipf:
-                for emoji in emojis:
-                    try:
-                        response = requests.get(emoji.url, stream=True, timeout=10)
-                        if response.status_code == 200:
-                            emoji_data = BytesIO(response.content)
-                            ext = "gif" if emoji.animated else "png"
-                            emoji_filename = f"{emoji.name}_{emoji.id}.{ext}"
-                            zipf.writestr(emoji_filename, emoji_data.getvalue())
-                    except Exception as e:
-                        logger.error(f"Error backing up emoji {emoji.name}: {e}")
-            
-            # Get file size
-            file_size = zip_path.stat().st_size / 1024  # KB
+            # Only emojis that are new since the last backup get downloaded
+            result = await self.backup_store.create_backup(guild.id, name, emojis, self._fetch_emoji)
             
             embed = discord.Embed(
                 title="✅ Backup Complete",
-                description=f"Backed up **{len(emojis)}** emojis",
+                description=f"Backed up **{result['emojis']}** emojis",
                 color=discord.Color.green()
             )
             embed.add_field(name="Backup Name", value=f"`{name}`", inline=True)
-            embed.add_field(name="File Size", value=f"{file_size:.2f} KB", inline=True)
-            embed.add_field(name="Emojis", value=str(len(emojis)), inline=True)
+            embed.add_field(name="New Data", value=f"{result['bytes_added'] / 1024:.2f} KB", inline=True)
+            embed.add_field(name="Emojis", value=str(result["emojis"]), inline=True)
+            embed.add_field(
+                name="Incremental",
+                value=f"{result['downloaded']} downloaded, {result['reused']} unchanged",
+                inline=True
+            )
+            if result["failed"]:
+                embed.add_field(name="Failed", value=str(result["failed"]), inline=True)
             
             await interaction.followup.send(embed=embed)
             logger.info(f"Created backup '{name}' for guild {guild.id}")
@@ -79,39 +77,32 @@ class BackupManagement(commands.Cog):
     async def list_backups(self, interaction: discord.Interaction):
         """List all backups for this server."""
         guild = interaction.guild
-        server_backup_folder = self.backup_folder / str(guild.id)
+        backups = await self.backup_store.list_backups(guild.id)
         
-        if not server_backup_folder.exists():
+        if not backups:
             await interaction.response.send_message(
                 "❌ No backups found for this server.",
                 ephemeral=True
             )
             return
         
-        backup_files = list(server_backup_folder.glob("*.zip"))
-        
-        if not backup_files:
-            await interaction.response.send_message(
-                "❌ No backup files found for this server.",
-                ephemeral=True
-            )
-            return
-        
         # Create embed
         embed = discord.Embed(
             title="💾 Server Backups",
-            description=f"Found {len(backup_files)} backup(s)",
+            description=f"Found {len(backups)} backup(s)",
             color=discord.Color.blue()
         )
         
-        for backup_file in backup_files[:10]:  # Show max 10
-            backup_name = backup_file.stem.replace("_backup", "")
-            file_size = backup_file.stat().st_size / 1024  # KB
-            modified_time = datetime.fromtimestamp(backup_file.stat().st_mtime)
+        for backup in backups[:10]:  # Show max 10
+            file_size = backup["size"] / 1024  # KB
+            created_time = datetime.fromtimestamp(backup["created_at"])
+            value = f"Size: {file_size:.2f} KB\nCreated: {created_time.strftime('%Y-%m-%d %H:%M')}"
+            if backup["emojis"] is not None:
+                value += f"\nEmojis: {backup['emojis']}"
             
             embed.add_field(
-                name=f"📦 {backup_name}",
-                value=f"Size: {file_size:.2f} KB\nCreated: {modified_time.strftime('%Y-%m-%d %H:%M')}",
+                name=f"📦 {backup['name']}",
+                value=value,
                 inline=True
             )
         
@@ -125,65 +116,123 @@ class BackupManagement(commands.Cog):
         await interaction.response.defer()
         
         guild = interaction.guild
-        server_backup_folder = self.backup_folder / str(guild.id)
-        backup_path = server_backup_folder / f"{name}_backup.zip"
-        
-        if not backup_path.exists():
-            await interaction.followup.send(
-                f"❌ No backup found with the name `{name}`."
-            )
+        key = (guild.id, name)
+        if key in self._active_restores:
+            await interaction.followup.send(f"❌ Backup `{name}` is already being restored.")
             return
         
+        # Claim the restore before awaiting anything, so a concurrent invocation sees it
+        self._active_restores.add(key)
+        try:
+            reader = None
+            if self.backup_store.validate_name(name):
+                reader = await self.backup_store.open_backup(guild.id, name)
+            
+            if reader is None:
+                await interaction.followup.send(
+                    f"❌ No backup found with the name `{name}`."
+                )
+                return
+            
+            async with reader:
+                await self._restore(interaction, name, reader)
+        finally:
+            self._active_restores.discard(key)
+    
+    async def _restore(self, interaction: discord.Interaction, name: str, reader):
+        """Upload a backup's emojis, checkpointing each one so an interrupted restore can resume."""
+        guild = interaction.guild
+        job = await self.backup_store.restore_job(guild.id, name)
+        
+        # Skip what an earlier run already uploaded and what the server already has
+        guild_emojis = self.bot.guild_emojis.get(guild)
+        pending = []
+        resumed = present = 0
+        for entry in reader.entries:
+            if job.is_done(entry):
+                resumed += 1
+            elif guild_emojis.has_name(entry.name):
+                present += 1
+            else:
+                pending.append(entry)
+        
+        # Images are read on the backup I/O pool ahead of the uploads
+        images = reader.stream(pending)
         try:
             uploaded = 0
             failed = 0
+            interrupted = False
             
-            with zipfile.ZipFile(backup_path, 'r') as zipf:
-                file_list = [f for f in zipf.namelist() if f.endswith(('.png', '.gif'))]
-                
-                embed = discord.Embed(
-                    title="📥 Restoring Backup",
-                    description=f"Restoring {len(file_list)} emojis...",
-                    color=discord.Color.blue()
-                )
-                status_msg = await interaction.followup.send(embed=embed)
+            description = f"Restoring {len(pending)} emojis..."
+            if resumed:
+                description += f"\nResuming: {resumed} already restored by an earlier run"
+            embed = discord.Embed(
+                title="📥 Restoring Backup",
+                description=description,
+                color=discord.Color.blue()
+            )
+            status_msg = await interaction.followup.send(embed=embed)
+            
+            async for entry, emoji_data, error in images:
+                emoji_name = entry.name
+                if error is not None:
+                    logger.error(f"Error reading emoji {emoji_name} from backup: {error}")
+                    failed += 1
+                    continue
                 
-                for file_name in file_list:
-                    emoji_data = zipf.read(file_name)
-                    emoji_name = file_name.split("_")[0]
+                try:
+                    await self.emoji_scheduler.create_emoji(guild, name=emoji_name, image=emoji_data)
+                    uploaded += 1
+                    await job.checkpoint(entry)
                     
-                    try:
-                        await guild.create_custom_emoji(name=emoji_name, image=emoji_data)
-                        uploaded += 1
-                        
-                        # Update progress every 5 emojis
-                        if uploaded % 5 == 0:
-                            embed.description = f"Progress: {uploaded}/{len(file_list)} restored"
-                            await status_msg.edit(embed=embed)
-                            
-                    except discord.Forbidden:
-                        await interaction.followup.send(
-                            "❌ I don't have permission to upload emojis."
+                    # Update progress every 5 emojis
+                    if uploaded % 5 == 0:
+                        eta = self.emoji_scheduler.estimate_completion(
+                            guild.id, creates=len(pending) - uploaded - failed
+                        )
+                        embed.description = (
+                            f"Progress: {uploaded}/{len(pending)} restored\n"
+                            f"Estimated time remaining: {int(eta)}s"
                         )
-                        break
-                    except Exception as e:
-                        logger.error(f"Error uploading emoji {emoji_name}: {e}")
-                        failed += 1
+                        await status_msg.edit(embed=embed)
+                        
+                except discord.Forbidden:
+                    await interaction.followup.send(
+                        "❌ I don't have permission to upload emojis. "
+                        f"Run `/uploadbackup {name}` again to resume."
+                    )
+                    interrupted = True
+                    break
+                except Exception as e:
+                    logger.error(f"Error uploading emoji {emoji_name}: {e}")
+                    failed += 1
+            
+            if not interrupted:
+                await job.finish()
             
             # Final summary
-            embed.title = "✅ Restore Complete"
+            embed.title = "⚠️ Restore Interrupted" if interrupted else "✅ Restore Complete"
             embed.description = (
                 f"**Restored:** {uploaded} emojis\n"
+                f"**Already present:** {present + resumed}\n"
                 f"**Failed:** {failed}"
             )
-            embed.color = discord.Color.green()
+            embed.color = discord.Color.orange() if interrupted else discord.Color.green()
             await status_msg.edit(embed=embed)
             
-            logger.info(f"Restored {uploaded} emojis from backup '{name}' to guild {guild.id}")
+            logger.info(
+                f"Restored {uploaded} emojis from backup '{name}' to guild {guild.id} "
+                f"({resumed} resumed, {present} already present, {failed} failed)"
+            )
             
         except Exception as e:
             logger.error(f"Error restoring backup: {e}")
-            await interaction.followup.send("❌ An error occurred while restoring the backup.")
+            await interaction.followup.send(
+                "❌ An error occurred while restoring the backup. "
+                f"Run `/uploadbackup {name}` again to resume."
+            )
+        finally:
+            await images.aclose()
     
     @app_commands.command(name="deleteallemojis", description="Delete all server emojis (creates backup)")
     @commands.has_permissions(manage_emojis=True)
@@ -226,35 +275,27 @@ class BackupManagement(commands.Cog):
         
         try:
             # Create automatic backup
-            server_backup_folder = self.backup_folder / str(guild.id)
-            server_backup_folder.mkdir(exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            zip_path = server_backup_folder / f"{guild.id}_backup_{timestamp}.zip"
+            backup_name = f"auto_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            await self.backup_store.create_backup(guild.id, backup_name, emojis, self._fetch_emoji)
             
-            with zipfile.ZipFile(zip_path, "w") as zipf:
-                for emoji in emojis:
-                    try:
-                        response = requests.get(emoji.url, stream=True, timeout=10)
-                        if response.status_code == 200:
-                            emoji_data = BytesIO(response.content)
-                            ext = "gif" if emoji.animated else "png"
-                            emoji_filename = f"{emoji.name}_{emoji.id}.{ext}"
-                            zipf.writestr(emoji_filename, emoji_data.getvalue())
-                    except Exception as e:
-                        logger.error(f"Error backing up emoji {emoji.name}: {e}")
-            
-            # Delete emojis
+            # Delete emojis (queued all at once; the scheduler paces them)
+            eta = self.emoji_scheduler.estimate_completion(guild.id, deletes=len(emojis))
+            await interaction.edit_original_response(
+                content=f"Backup created. Deleting {len(emojis)} emojis (about {int(eta)}s)..."
+            )
+            results = await asyncio.gather(
+                *(self.emoji_scheduler.delete_emoji(emoji) for emoji in emojis),
+                return_exceptions=True
+            )
             deleted_count = 0
-            for emoji in emojis:
-                try:
-                    await emoji.delete()
+            for emoji, result in zip(emojis, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error deleting emoji {emoji.name}: {result}")
+                else:
                     deleted_count += 1
-                except Exception as e:
-                    logger.error(f"Error deleting emoji {emoji.name}: {e}")
             
             await interaction.edit_original_response(
-                content=f"✅ Deleted {deleted_count} emojis. Backup saved as `{timestamp}`."
+                content=f"✅ Deleted {deleted_count} emojis. Backup saved as `{backup_name}`."
             )
             logger.info(f"Deleted {deleted_count} emojis from guild {guild.id}")
             
@@ -1,9 +1,10 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import requests
 from typing import Optional
+from utils.http_client import DownloadError, DownloadStatusError, DownloadTooLargeError
 from utils.logger import setup_logger
+from utils.prefetch import prefetch
 
 logger = setup_logger(__name__)
 
@@ -15,6 +16,10 @@ class EmojiManagement(commands.Cog):
         self.config = bot.config
         self.emoji_cache = bot.emoji_cache
         self.emoji_filter = bot.emoji_filter
+        self.http_client = bot.http_client
+        self.emoji_scheduler = bot.emoji_scheduler
+        self.blob_cache = bot.blob_cache
+        self.guild_emojis = bot.guild_emojis
     
     def _can_manage_emojis(self, ctx: commands.Context) -> bool:
         """Check if user can manage emojis."""
@@ -37,8 +42,7 @@ class EmojiManagement(commands.Cog):
             return
         
         # Check if emoji with this name already exists
-        existing_emojis = [emoji.name for emoji in interaction.guild.emojis]
-        if name in existing_emojis:
+        if self.guild_emojis.get(interaction.guild).has_name(name):
             await interaction.response.send_message(
                 f"❌ An emoji with the name `{name}` already exists in this server.",
                 ephemeral=True
@@ -48,25 +52,12 @@ class EmojiManagement(commands.Cog):
         await interaction.response.defer()
         
         try:
-            # Download emoji
-            response = requests.get(emoji_url, stream=True, timeout=10)
-            if response.status_code != 200:
-                await interaction.followup.send(
-                    f"❌ Failed to download emoji. Status code: {response.status_code}"
-                )
-                return
-            
-            emoji_bytes = response.content
-            
-            # Validate file size
-            if len(emoji_bytes) > 256000:  # 256KB limit
-                await interaction.followup.send(
-                    "❌ Emoji file is too large (max 256KB)."
-                )
-                return
+            # Download emoji (aborts as soon as it exceeds the 256KB limit)
+            emoji_bytes = await self.blob_cache.get_or_fetch(emoji_url, self.http_client.download_image)
             
             # Create emoji
-            new_emoji = await interaction.guild.create_custom_emoji(
+            new_emoji = await self.emoji_scheduler.create_emoji(
+                interaction.guild,
                 name=name,
                 image=emoji_bytes
             )
@@ -76,6 +67,19 @@ class EmojiManagement(commands.Cog):
             )
             logger.info(f"Added emoji {name} to guild {interaction.guild.id}")
             
+        except DownloadStatusError as e:
+            await interaction.followup.send(
+                f"❌ Failed to download emoji. Status code: {e.status}"
+            )
+        except DownloadTooLargeError:
+            await interaction.followup.send(
+                "❌ Emoji file is too large (max 256KB)."
+            )
+        except DownloadError as e:
+            logger.warning(f"Error downloading emoji: {e}")
+            await interaction.followup.send(
+                "❌ Failed to download emoji."
+            )
         except discord.Forbidden:
             await interaction.followup.send(
                 "❌ I don't have the `Manage Emojis and Stickers` permission."
@@ -134,11 +138,7 @@ class EmojiManagement(commands.Cog):
             # Get category ID if category name provided
             category_id = None
             if category:
-                categories = await self.emoji_cache.get_categories(api_url)
-                for cat in categories:
-                    if cat.get("name", "").lower() == category.lower():
-                        category_id = cat.get("id")
-                        break
+                category_id = await self.emoji_cache.resolve_category(api_url, category)
                 
                 if category_id is None:
                     await interaction.followup.send(
@@ -162,8 +162,10 @@ class EmojiManagement(commands.Cog):
             # Sort by favorites (best quality first)
             sorted_emojis = self.emoji_filter.sort_emojis(filtered_emojis, sort_by="favorites")
             
-            # Get existing emoji names
-            existing_emojis = [emoji.name for emoji in interaction.guild.emojis]
+            # Existing emoji names come from the guild's index; names uploaded by this run are tracked here.
+            # A name is only taken once its upload succeeded, so a failed upload leaves it to later duplicates.
+            guild_emojis = self.guild_emojis.get(interaction.guild)
+            uploaded_names = set()
             
             # Upload emojis
             uploaded = 0
@@ -177,50 +179,84 @@ class EmojiManagement(commands.Cog):
             )
             status_msg = await interaction.followup.send(embed=embed)
             
-            for emoji_data in sorted_emojis:
-                if uploaded >= amount:
-                    break
-                
-                emoji_name = emoji_data.get("title", "").replace(" ", "_")
-                emoji_url = emoji_data.get("image")
-                
-                # Skip if already exists
-                if emoji_name in existing_emojis:
-                    skipped += 1
-                    continue
-                
-                try:
-                    # Download emoji
-                    response = requests.get(emoji_url, stream=True, timeout=10)
-                    if response.status_code != 200:
-                        failed += 1
-                        continue
-                    
-                    emoji_bytes = response.content
-                    
-                    # Create emoji
-                    await interaction.guild.create_custom_emoji(
-                        name=emoji_name,
-                        image=emoji_bytes
-                    )
-                    uploaded += 1
-                    existing_emojis.append(emoji_name)
+            def candidates():
+                """Yield (emoji data, name, prefetched) in upload order, pulled lazily by the prefetcher."""
+                queued = set()
+                for emoji_data in sorted_emojis:
+                    emoji_name = emoji_data.get("title", "").replace(" ", "_")
+                    # Only the first candidate of a name is downloaded ahead; later ones only if it failed
+                    prefetched = emoji_name not in queued and not guild_emojis.has_name(emoji_name)
+                    queued.add(emoji_name)
+                    yield emoji_data, emoji_name, prefetched
+            
+            async def download(emoji_data):
+                return await self.blob_cache.get_or_fetch(emoji_data.get("image"), self.http_client.download_image)
+            
+            async def prefetch_download(candidate):
+                emoji_data, _, prefetched = candidate
+                if not prefetched:
+                    return None
+                return await download(emoji_data)
+            
+            # Downloads run ahead of the uploads through a bounded prefetch queue
+            pipeline = prefetch(
+                candidates(),
+                prefetch_download,
+                concurrency=self.config.get("upload.download_concurrency", 4),
+                buffer_size=self.config.get("upload.prefetch_buffer", 8)
+            )
+            try:
+                async for (emoji_data, emoji_name, prefetched), emoji_bytes, error in pipeline:
+                    if uploaded >= amount:
+                        break
                     
-                    # Update progress every 5 emojis
-                    if uploaded % 5 == 0:
-                        embed.description = f"Progress: {uploaded}/{amount} uploaded, {skipped} skipped, {failed} failed"
-                        await status_msg.edit(embed=embed)
+                    # Skip if already exists
+                    if emoji_name in uploaded_names or guild_emojis.has_name(emoji_name):
+                        skipped += 1
+                        continue
                     
-                except discord.Forbidden:
-                    await interaction.followup.send(
-                        "❌ I don't have the `Manage Emojis and Stickers` permission."
-                    )
-                    break
-                except discord.HTTPException:
-                    failed += 1
-                except Exception as e:
-                    logger.error(f"Error uploading emoji {emoji_name}: {e}")
-                    failed += 1
+                    try:
+                        if error is not None:
+                            raise error
+                        if not prefetched:
+                            # A later candidate of a name whose earlier upload failed
+                            emoji_bytes = await download(emoji_data)
+                        
+                        # Create emoji
+                        await self.emoji_scheduler.create_emoji(
+                            interaction.guild,
+                            name=emoji_name,
+                            image=emoji_bytes
+                        )
+                        uploaded += 1
+                        uploaded_names.add(emoji_name)
+                        
+                        # Update progress every 5 emojis
+                        if uploaded % 5 == 0:
+                            eta = self.emoji_scheduler.estimate_completion(
+                                interaction.guild.id, creates=amount - uploaded
+                            )
+                            embed.description = (
+                                f"Progress: {uploaded}/{amount} uploaded, {skipped} skipped, {failed} failed\n"
+                                f"Estimated time remaining: {int(eta)}s"
+                            )
+                            await status_msg.edit(embed=embed)
+                        
+                    except discord.Forbidden:
+                        await interaction.followup.send(
+                            "❌ I don't have the `Manage Emojis and Stickers` permission."
+                        )
+                        break
+                    except DownloadError as e:
+                        logger.warning(f"Error downloading emoji {emoji_name}: {e}")
+                        failed += 1
+                    except discord.HTTPException:
+                        failed += 1
+                    except Exception as e:
+                        logger.error(f"Error uploading emoji {emoji_name}: {e}")
+                        failed += 1
+            finally:
+                await pipeline.aclose()
             
             # Final summary
             embed.title = "✅ Upload Complete"
@@ -244,15 +280,7 @@ class EmojiManagement(commands.Cog):
     @app_commands.describe(identifier="Emoji name or ID")
     async def retrieve_emoji(self, interaction: discord.Interaction, identifier: str):
         """Quickly retrieve and display an emoji."""
-        found_emoji = None
-        
-        for emoji in interaction.guild.emojis:
-            if identifier.isdigit() and emoji.id == int(identifier):
-                found_emoji = emoji
-                break
-            elif emoji.name.lower() == identifier.lower():
-                found_emoji = emoji
-                break
+        found_emoji = self.guild_emojis.get(interaction.guild).find(identifier)
         
         if found_emoji:
             await interaction.response.send_message(str(found_emoji))
@@ -14,6 +14,11 @@ class EmojiSearch(commands.Cog):
         self.config = bot.config
         self.emoji_cache = bot.emoji_cache
         self.emoji_filter = bot.emoji_filter
+        self.query_cache = bot.query_cache
+    
+    def _data_version(self):
+        """Version of everything query results depend on: the emoji catalog and the config."""
+        return (self.emoji_cache.version, self.config.version)
     
     @app_commands.command(name="search", description="Search for emojis by name or description")
     @app_commands.describe(
@@ -35,6 +40,8 @@ class EmojiSearch(commands.Cog):
             # Get emojis from cache
             api_url = self.config.get("api.base_url")
             emojis = await self.emoji_cache.get_emojis(api_url)
+            # Read before any other await, so a refresh meanwhile cannot label results from this list as newer
+            version = self._data_version()
             
             if not emojis:
                 await interaction.followup.send("❌ Failed to fetch emojis from API.")
@@ -43,34 +50,43 @@ class EmojiSearch(commands.Cog):
             # Get category ID if provided
             category_id = None
             if category:
-                categories = await self.emoji_cache.get_categories(api_url)
-                for cat in categories:
-                    if cat.get("name", "").lower() == category.lower():
-                        category_id = cat.get("id")
-                        break
-            
-            # Filter and search
-            filtered_emojis = self.emoji_filter.filter_emojis(
-                emojis,
-                category=category_id,
-                search_query=query,
-                adult_filter=True
-            )
+                category_id = await self.emoji_cache.resolve_category(api_url, category)
+            
+            # Repeat queries are served from the result cache
+            key = ("search", query.lower(), category_id)
+            sorted_emojis = self.query_cache.get(key, version)
+            if sorted_emojis is None:
+                # Narrow the catalog to query matches through the trigram index
+                search_index = self.emoji_cache.search_index
+                if search_index.emojis is emojis:
+                    candidates, search_query = search_index.search(query), None
+                else:
+                    candidates, search_query = emojis, query
+                
+                # Filter the matches
+                filtered_emojis = self.emoji_filter.filter_emojis(
+                    candidates,
+                    category=category_id,
+                    search_query=search_query,
+                    adult_filter=True
+                )
+                
+                # Sort by favorites
+                sorted_emojis = tuple(self.emoji_filter.sort_emojis(filtered_emojis, sort_by="favorites"))
+                self.query_cache.put(key, version, sorted_emojis, size=len(sorted_emojis))
             
-            if not filtered_emojis:
+            if not sorted_emojis:
                 await interaction.followup.send(
                     f"❌ No emojis found matching `{query}`."
                 )
                 return
             
-            # Sort by favorites
-            sorted_emojis = self.emoji_filter.sort_emojis(filtered_emojis, sort_by="favorites")
             results = sorted_emojis[:limit]
             
             # Create embed
             embed = discord.Embed(
                 title=f"🔍 Search Results for '{query}'",
-                description=f"Found {len(filtered_emojis)} emojis (showing top {len(results)})",
+                description=f"Found {len(sorted_emojis)} emojis (showing top {len(results)})",
                 color=discord.Color.blue()
             )
             
@@ -110,6 +126,8 @@ class EmojiSearch(commands.Cog):
             # Get emojis from cache
             api_url = self.config.get("api.base_url")
             emojis = await self.emoji_cache.get_emojis(api_url)
+            # Read before any other await, so a refresh meanwhile cannot label results from this list as newer
+            version = self._data_version()
             
             if not emojis:
                 await interaction.followup.send("❌ Failed to fetch emojis from API.")
@@ -118,18 +136,18 @@ class EmojiSearch(commands.Cog):
             # Get category ID if provided
             category_id = None
             if category:
-                categories = await self.emoji_cache.get_categories(api_url)
-                for cat in categories:
-                    if cat.get("name", "").lower() == category.lower():
-                        category_id = cat.get("id")
-                        break
+                category_id = await self.emoji_cache.resolve_category(api_url, category)
             
             # Get trending emojis
-            trending_emojis = self.emoji_filter.get_trending_emojis(
-                emojis,
-                limit=limit,
-                category=category_id
-            )
+            key = ("trending", limit, category_id)
+            trending_emojis = self.query_cache.get(key, version)
+            if trending_emojis is None:
+                trending_emojis = tuple(self.emoji_filter.get_trending_emojis(
+                    emojis,
+                    limit=limit,
+                    category=category_id
+                ))
+                self.query_cache.put(key, version, trending_emojis, size=len(trending_emojis))
             
             if not trending_emojis:
                 await interaction.followup.send("❌ No trending emojis found.")
@@ -173,12 +191,9 @@ class EmojiSearch(commands.Cog):
                 await interaction.followup.send("❌ Failed to fetch categories.")
                 return
             
-            # Get emoji counts per category
-            emojis = await self.emoji_cache.get_emojis(api_url)
-            category_counts = {}
-            for emoji in emojis:
-                cat_id = emoji.get("category")
-                category_counts[cat_id] = category_counts.get(cat_id, 0) + 1
+            # Make sure the per-category counts are built
+            await self.emoji_cache.get_emojis(api_url)
+            category_index = self.emoji_cache.category_index
             
             # Create embed
             embed = discord.Embed(
@@ -187,19 +202,11 @@ class EmojiSearch(commands.Cog):
                 color=discord.Color.purple()
             )
             
-            # Sort categories by emoji count
-            sorted_categories = sorted(
-                categories,
-                key=lambda c: category_counts.get(c.get("id"), 0),
-                reverse=True
-            )
-            
             category_text = ""
-            for cat in sorted_categories[:20]:  # Show top 20
+            for cat, count in category_index.ranked()[:20]:  # Show top 20, largest first
                 cat_name = cat.get("name", "Unknown")
-                cat_id = cat.get("id")
-                count = category_counts.get(cat_id, 0)
-                category_text += f"**{cat_name}** - {count} emojis\n"
+                animated = category_index.animated_count(cat.get("id"))
+                category_text += f"**{cat_name}** - {count} emojis ({animated} animated)\n"
             
             embed.description = category_text
             
@@ -235,27 +242,20 @@ class EmojiSearch(commands.Cog):
             # Get category ID if provided
             category_id = None
             if category:
-                categories = await self.emoji_cache.get_categories(api_url)
-                for cat in categories:
-                    if cat.get("name", "").lower() == category.lower():
-                        category_id = cat.get("id")
-                        break
-            
-            # Filter emojis
-            filtered_emojis = self.emoji_filter.filter_emojis(
+                category_id = await self.emoji_cache.resolve_category(api_url, category)
+            
+            # Sampled from the eligible emojis; the guild's recently shown ones are avoided
+            results = self.emoji_filter.get_random_emojis(
                 emojis,
+                count=count,
                 category=category_id,
-                adult_filter=True
+                guild_id=interaction.guild_id
             )
             
-            if not filtered_emojis:
+            if not results:
                 await interaction.followup.send("❌ No emojis found.")
                 return
             
-            # Get random emojis
-            random_emojis = self.emoji_filter.sort_emojis(filtered_emojis, sort_by="random")
-            results = random_emojis[:count]
-            
             # Create embed
             embed = discord.Embed(
                 title="🎲 Random Emojis",
@@ -1,11 +1,19 @@
+import asyncio
 import discord
 from discord.ext import commands
 import os
 from dotenv import load_dotenv
-from utils.logger import setup_logger
+from utils.logger import configure_logging, setup_logger, shutdown_logging
+from utils.blob_cache import BlobCache
+from utils.command_tree import InstrumentedCommandTree
 from utils.config_manager import ConfigManager
 from utils.emoji_cache import EmojiCache
 from utils.emoji_filter import EmojiFilter
+from utils.guild_emoji_index import GuildEmojiIndex
+from utils.query_cache import QueryCache
+from utils.emoji_scheduler import EmojiMutationScheduler
+from utils.http_client import HttpClient
+from utils.metrics import REGISTRY, LoopLagMonitor, MetricsExporter
 
 # Load environment variables
 load_dotenv()
@@ -15,12 +23,34 @@ logger = setup_logger()
 
 # Bot configuration
 intents = discord.Intents.all()
-bot = commands.Bot(command_prefix='$', intents=intents)
+bot = commands.Bot(command_prefix='$', intents=intents, tree_cls=InstrumentedCommandTree)
 
 # Initialize utilities
 bot.config = ConfigManager()
-bot.emoji_cache = EmojiCache(ttl=bot.config.get("api.cache_ttl", 3600))
+configure_logging(bot.config)
+bot.http_client = HttpClient.from_config(bot.config)
+bot.blob_cache = BlobCache.from_config(bot.config)
+bot.emoji_cache = EmojiCache(
+    ttl=bot.config.get("api.cache_ttl", 3600),
+    snapshot_path=bot.config.get("cache.snapshot_path"),
+    http_client=bot.http_client
+)
 bot.emoji_filter = EmojiFilter(bot.config)
+bot.query_cache = QueryCache.from_config(bot.config)
+bot.emoji_scheduler = EmojiMutationScheduler.from_config(bot.config)
+bot.guild_emojis = GuildEmojiIndex()
+bot.metrics_exporter = MetricsExporter.from_config(bot.config)
+bot.loop_lag_monitor = LoopLagMonitor(interval=bot.config.get("metrics.loop_lag_interval", 0.5))
+REGISTRY.gauge(
+    "bot_emoji_queue_pending", "Emoji creations and deletions waiting in the scheduler",
+    function=lambda: bot.emoji_scheduler.get_stats()["pending"]
+)
+REGISTRY.gauge("bot_guilds", "Guilds the bot is in", function=lambda: len(bot.guilds))
+# The catalog reuses the per-category positions the cache just indexed
+bot.emoji_cache.add_refresh_listener(bot.emoji_filter.prepare_catalog)
+
+# Serve commands from the last snapshot right away; a fresh copy is fetched in the background
+bot.emoji_cache.load_snapshot()
 
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 
@@ -29,6 +59,7 @@ async def on_ready():
     """Called when the bot is ready."""
     logger.info(f'Logged in as {bot.user.name} (ID: {bot.user.id})')
     logger.info(f'Connected to {len(bot.guilds)} guilds')
+    bot.guild_emojis.rebuild(bot.guilds)
     
     try:
         # Sync slash commands
@@ -37,6 +68,26 @@ async def on_ready():
     except Exception as e:
         logger.error(f"Error synchronizing commands: {e}")
 
+@bot.event
+async def on_guild_emojis_update(guild, before, after):
+    """Keep the guild's emoji index in sync."""
+    bot.guild_emojis.on_emojis_update(guild, after)
+
+@bot.event
+async def on_guild_join(guild):
+    """Index the emojis of a newly joined guild."""
+    bot.guild_emojis.on_guild_join(guild)
+
+@bot.event
+async def on_guild_remove(guild):
+    """Drop the emoji index of a guild the bot left."""
+    bot.guild_emojis.on_guild_remove(guild)
+
+@bot.event
+async def on_app_command_completion(interaction, command):
+    """Record the duration of a successful slash command."""
+    bot.tree.record(interaction, "ok")
+
 async def load_cogs():
     """Load all cogs."""
     cogs = [
@@ -56,9 +107,22 @@ async def load_cogs():
 async def main():
     """Main entry point."""
     async with bot:
-        await load_cogs()
-        await bot.start(BOT_TOKEN)
+        await bot.http_client.start()
+        bot.loop_lag_monitor.start()
+        try:
+            await bot.metrics_exporter.start()
+            await load_cogs()
+            bot.cache_refresh_task = asyncio.create_task(
+                bot.emoji_cache.refresh_all(bot.config.get("api.base_url"))
+            )
+            await bot.start(BOT_TOKEN)
+        finally:
+            await bot.metrics_exporter.close()
+            await bot.loop_lag_monitor.close()
+            await bot.emoji_scheduler.close()
+            await bot.http_client.close()
+            await bot.config.settings.close()
+            shutdown_logging()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,469 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from utils.logger import setup_logger
+from utils.prefetch import prefetch
+
+logger = setup_logger(__name__)
+
+# Bump when the manifest layout changes
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".manifest.json"
+# Zip backups from before manifests: "<name>_backup.zip" for named backups,
+# "<guild>_backup_<timestamp>.zip" for the automatic ones taken by /deleteallemojis
+LEGACY_SUFFIX = "_backup.zip"
+JOB_SUFFIX = ".restore.json"
+
+class BackupEntry:
+    """One emoji recorded in a backup."""
+    
+    def __init__(self, name: str, emoji_id: int, animated: bool, digest: Optional[str] = None, member: Optional[str] = None):
+        """
+        Initialize a backup entry.
+        
+        Args:
+            name: Emoji name
+            emoji_id: Emoji ID at the time of the backup
+            animated: Whether the emoji is animated
+            digest: sha256 of the image in the object store (manifest backups)
+            member: Zip member holding the image (legacy zip backups)
+        """
+        self.name = name
+        self.id = emoji_id
+        self.animated = animated
+        self.digest = digest
+        self.member = member
+    
+    @property
+    def key(self) -> str:
+        """Identifies the entry within its backup (used by restore checkpoints)."""
+        return f"{self.id}:{self.name}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "id": self.id, "animated": self.animated, "hash": self.digest}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BackupEntry":
+        return cls(data["name"], data["id"], data["animated"], digest=data["hash"])
+
+class BackupStore:
+    """
+    Incremental emoji backups stored as manifests over a shared, deduplicated object store.
+    
+    Each backup is a small JSON manifest of (name, id, animated, hash) entries.
+    Images live once in the object store, keyed by sha256, so a new backup only
+    downloads emojis that were not in the guild's previous backup. Legacy full
+    zip backups can still be listed and restored.
+    
+    All disk work (hashing, reads, writes, zip parsing) runs on a small
+    dedicated thread pool, so large backups never stall the event loop and
+    never queue behind other executor work.
+    """
+    
+    def __init__(self, root: str = "emoji_backups", io_workers: int = 2, read_ahead: int = 4):
+        """
+        Initialize the backup store.
+        
+        Args:
+            root: Backup folder (one subfolder per guild, plus the shared object store)
+            io_workers: Threads in the backup I/O pool
+            read_ahead: Images read ahead of the consumer when streaming a restore
+        """
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.read_ahead = read_ahead
+        self.root.mkdir(exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="backup-io")
+    
+    @classmethod
+    def from_config(cls, config) -> "BackupStore":
+        """
+        Create a backup store from the `backups` section of the config.
+        
+        Args:
+            config: ConfigManager instance
+        """
+        return cls(
+            root=config.get("backups.path", "emoji_backups"),
+            io_workers=config.get("backups.io_workers", 2),
+            read_ahead=config.get("backups.read_ahead", 4)
+        )
+    
+    @staticmethod
+    def validate_name(name: str) -> bool:
+        """Check that a backup name is usable as a file name."""
+        return bool(name) and name == Path(name).name and not name.startswith(".")
+    
+    def guild_folder(self, guild_id: int) -> Path:
+        return self.root / str(guild_id)
+    
+    def _manifest_path(self, guild_id: int, name: str) -> Path:
+        return self.guild_folder(guild_id) / f"{name}{MANIFEST_SUFFIX}"
+    
+    @staticmethod
+    def _legacy_name(path: Path) -> str:
+        """Backup name of a legacy zip: named backups drop their suffix, automatic ones keep the full stem."""
+        if path.name.endswith(LEGACY_SUFFIX):
+            return path.name[:-len(LEGACY_SUFFIX)]
+        return path.stem
+    
+    def _legacy_path(self, guild_id: int, name: str) -> Optional[Path]:
+        """Find the legacy zip listed under a backup name, if any."""
+        folder = self.guild_folder(guild_id)
+        for path in (folder / f"{name}{LEGACY_SUFFIX}", folder / f"{name}.zip"):
+            if path.exists() and self._legacy_name(path) == name:
+                return path
+        return None
+    
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+    
+    def _job_path(self, guild_id: int, name: str) -> Path:
+        return self.guild_folder(guild_id) / "jobs" / f"{name}{JOB_SUFFIX}"
+    
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    def close(self):
+        """Shut down the I/O pool once running jobs finish."""
+        self._executor.shutdown(wait=False)
+    
+    def _read_manifest(self, path: Path) -> Dict[str, Any]:
+        return json.loads(path.read_text())
+    
+    def _write_json(self, path: Path, data: Dict[str, Any]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2))
+        os.replace(tmp_path, path)
+    
+    def _store_object(self, data: bytes) -> Tuple[str, bool]:
+        """Hash and store an object unless it already exists; returns (digest, whether it was written)."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if path.exists():
+            return digest, False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{digest}.{id(data)}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return digest, True
+    
+    def _existing_objects(self, digests: Iterable[str]) -> Set[str]:
+        return {digest for digest in digests if self._object_path(digest).exists()}
+    
+    def _latest_manifest(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Read the guild's most recent manifest, if any."""
+        folder = self.guild_folder(guild_id)
+        if not folder.exists():
+            return None
+        latest = None
+        for path in folder.glob(f"*{MANIFEST_SUFFIX}"):
+            try:
+                manifest = self._read_manifest(path)
+            except Exception as e:
+                logger.error(f"Error reading manifest {path}: {e}")
+                continue
+            if latest is None or manifest["created_at"] > latest["created_at"]:
+                latest = manifest
+        return latest
+    
+    async def create_backup(
+        self,
+        guild_id: int,
+        name: str,
+        emojis: Iterable[Any],
+        fetch: Callable[[str], Awaitable[bytes]]
+    ) -> Dict[str, Any]:
+        """
+        Create a backup, downloading only emojis that are not in the guild's previous backup.
+        
+        Args:
+            guild_id: Guild ID
+            name: Backup name
+            emojis: Guild emojis (objects with name, id, animated and url)
+            fetch: Coroutine function downloading an emoji URL
+        
+        Returns:
+            Summary with the number of emojis backed up, downloaded, reused and
+            failed, and the bytes added to the object store
+        """
+        previous = await self._run(self._latest_manifest, guild_id)
+        known = {}
+        if previous:
+            known = {entry["id"]: entry["hash"] for entry in previous["emojis"]}
+            present = await self._run(self._existing_objects, set(known.values()))
+            known = {emoji_id: digest for emoji_id, digest in known.items() if digest in present}
+        
+        entries = []
+        downloaded = reused = failed = bytes_added = 0
+        for emoji in emojis:
+            digest = known.get(emoji.id)
+            if digest is not None:
+                # Emoji IDs are immutable, so an ID seen in the last backup has the same image
+                reused += 1
+            else:
+                try:
+                    data = await fetch(emoji.url)
+                except Exception as e:
+                    logger.error(f"Error backing up emoji {emoji.name}: {e}")
+                    failed += 1
+                    continue
+                digest, written = await self._run(self._store_object, data)
+                if written:
+                    bytes_added += len(data)
+                downloaded += 1
+            entries.append(BackupEntry(emoji.name, emoji.id, emoji.animated, digest=digest))
+        
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "name": name,
+            "guild_id": guild_id,
+            "created_at": time.time(),
+            "emojis": [entry.to_dict() for entry in entries]
+        }
+        await self._run(self._write_json, self._manifest_path(guild_id, name), manifest)
+        logger.info(
+            f"Created backup '{name}' for guild {guild_id}: "
+            f"{downloaded} downloaded, {reused} reused, {failed} failed"
+        )
+        return {
+            "emojis": len(entries),
+            "downloaded": downloaded,
+            "reused": reused,
+            "failed": failed,
+            "bytes_added": bytes_added
+        }
+    
+    def _list_backups(self, guild_id: int) -> List[Dict[str, Any]]:
+        folder = self.guild_folder(guild_id)
+        if not folder.exists():
+            return []
+        
+        backups = []
+        for path in folder.glob(f"*{MANIFEST_SUFFIX}"):
+            try:
+                manifest = self._read_manifest(path)
+            except Exception as e:
+                logger.error(f"Error reading manifest {path}: {e}")
+                continue
+            size = 0
+            for entry in manifest["emojis"]:
+                try:
+                    size += self._object_path(entry["hash"]).stat().st_size
+                except FileNotFoundError:
+                    pass
+            backups.append({
+                "name": manifest["name"],
+                "created_at": manifest["created_at"],
+                "emojis": len(manifest["emojis"]),
+                "size": size
+            })
+        for path in folder.glob("*.zip"):
+            stat = path.stat()
+            backups.append({
+                "name": self._legacy_name(path),
+                "created_at": stat.st_mtime,
+                "emojis": None,
+                "size": stat.st_size
+            })
+        backups.sort(key=lambda b: b["created_at"], reverse=True)
+        return backups
+    
+    async def list_backups(self, guild_id: int) -> List[Dict[str, Any]]:
+        """
+        List a guild's backups, newest first.
+        
+        Args:
+            guild_id: Guild ID
+        
+        Returns:
+            List of dicts with name, created_at, emojis (None for legacy zips) and size in bytes
+        """
+        return await self._run(self._list_backups, guild_id)
+    
+    def _open_backup(self, guild_id: int, name: str) -> Optional[Tuple[List[BackupEntry], Optional[zipfile.ZipFile]]]:
+        manifest_path = self._manifest_path(guild_id, name)
+        if manifest_path.exists():
+            manifest = self._read_manifest(manifest_path)
+            return [BackupEntry.from_dict(entry) for entry in manifest["emojis"]], None
+        
+        legacy_path = self._legacy_path(guild_id, name)
+        if legacy_path is not None:
+            # Kept open for the whole restore so the central directory is only parsed once
+            zipf = zipfile.ZipFile(legacy_path, "r")
+            entries = []
+            for member in zipf.namelist():
+                if not member.endswith((".png", ".gif")):
+                    continue
+                stem, ext = member.rsplit(".", 1)
+                emoji_name, _, emoji_id = stem.rpartition("_")
+                entries.append(BackupEntry(
+                    emoji_name or stem,
+                    int(emoji_id) if emoji_id.isdigit() else 0,
+                    ext == "gif",
+                    member=member
+                ))
+            return entries, zipf
+        return None
+    
+    async def open_backup(self, guild_id: int, name: str) -> Optional["BackupReader"]:
+        """
+        Open a backup (manifest or legacy zip) for reading.
+        
+        Args:
+            guild_id: Guild ID
+            name: Backup name
+        
+        Returns:
+            A reader to close when done (use it with `async with`), or None if no
+            backup has this name
+        """
+        opened = await self._run(self._open_backup, guild_id, name)
+        if opened is None:
+            return None
+        entries, zipf = opened
+        return BackupReader(self, entries, zipf)
+    
+    def _load_job(self, path: Path) -> Optional[Dict[str, Any]]:
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text())
+        except Exception as e:
+            logger.error(f"Error reading restore checkpoint {path}: {e}")
+            return None
+    
+    async def restore_job(self, guild_id: int, name: str) -> "RestoreJob":
+        """
+        Get the restore job for a backup, resuming from its checkpoint if an earlier restore was interrupted.
+        
+        Args:
+            guild_id: Guild ID
+            name: Backup name
+        
+        Returns:
+            The restore job (fresh if there is no checkpoint)
+        """
+        path = self._job_path(guild_id, name)
+        checkpoint = await self._run(self._load_job, path)
+        if checkpoint is None:
+            return RestoreJob(self, path, set(), time.time(), resumed=False)
+        return RestoreJob(self, path, set(checkpoint["done"]), checkpoint["started_at"], resumed=True)
+    
+    def _delete_file(self, path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def _read_entry(self, entry: BackupEntry, zipf: Optional[zipfile.ZipFile], zip_lock: threading.Lock) -> bytes:
+        if entry.digest is not None:
+            return self._object_path(entry.digest).read_bytes()
+        # ZipFile's file handle bookkeeping is not safe for concurrent opens
+        with zip_lock:
+            return zipf.read(entry.member)
+
+class BackupReader:
+    """An open backup whose images are read on the backup I/O pool."""
+    
+    def __init__(self, store: BackupStore, entries: List[BackupEntry], zipf: Optional[zipfile.ZipFile]):
+        self.store = store
+        self.entries = entries
+        self._zipf = zipf
+        self._zip_lock = threading.Lock()
+    
+    async def __aenter__(self) -> "BackupReader":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def read(self, entry: BackupEntry) -> bytes:
+        """
+        Read the image of one entry.
+        
+        Args:
+            entry: One of this backup's entries
+        
+        Returns:
+            The image bytes
+        """
+        return await self.store._run(self.store._read_entry, entry, self._zipf, self._zip_lock)
+    
+    def stream(
+        self,
+        entries: Optional[Iterable[BackupEntry]] = None
+    ) -> AsyncIterator[Tuple[BackupEntry, Optional[bytes], Optional[Exception]]]:
+        """
+        Read images in order, keeping up to the store's read_ahead images loaded ahead of the consumer.
+        
+        Args:
+            entries: Entries to read (default: all of them)
+        
+        Returns:
+            Async generator of (entry, image, error) tuples; close it (aclose) when stopping early
+        """
+        read_ahead = self.store.read_ahead
+        return prefetch(
+            self.entries if entries is None else entries,
+            self.read,
+            concurrency=read_ahead,
+            buffer_size=read_ahead
+        )
+    
+    async def close(self):
+        """Close the underlying zip file of a legacy backup."""
+        if self._zipf is not None:
+            zipf, self._zipf = self._zipf, None
+            await self.store._run(zipf.close)
+
+class RestoreJob:
+    """
+    Progress of a backup restore, checkpointed to disk after every emoji.
+    
+    The checkpoint survives restarts and permission errors, so running the
+    restore again skips the emojis that were already uploaded.
+    """
+    
+    def __init__(self, store: BackupStore, path: Path, done: Set[str], started_at: float, resumed: bool):
+        self.store = store
+        self.path = path
+        self.done = done
+        self.started_at = started_at
+        self.resumed = resumed
+    
+    def is_done(self, entry: BackupEntry) -> bool:
+        """Check whether an entry was uploaded by this job (before or after resuming)."""
+        return entry.key in self.done
+    
+    async def checkpoint(self, entry: BackupEntry):
+        """
+        Record an uploaded entry and persist the checkpoint.
+        
+        Args:
+            entry: Entry that was just uploaded
+        """
+        self.done.add(entry.key)
+        checkpoint = {
+            "version": MANIFEST_VERSION,
+            "started_at": self.started_at,
+            "updated_at": time.time(),
+            "done": sorted(self.done)
+        }
+        try:
+            await self.store._run(self.store._write_json, self.path, checkpoint)
+        except Exception as e:
+            logger.error(f"Error saving restore checkpoint {self.path}: {e}")
+    
+    async def finish(self):
+        """Delete the checkpoint once the restore has gone through every entry."""
+        await self.store._run(self.store._delete_file, self.path)
@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+
+logger = setup_logger(__name__)
+
+CACHE_LOOKUPS = REGISTRY.counter("bot_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+
+class BlobCache:
+    """Content-addressed on-disk cache for downloaded images, keyed by URL and sha256, with LRU eviction."""
+    
+    def __init__(
+        self,
+        root: Optional[str] = "cache/blobs",
+        max_bytes: int = 256 * 1024 * 1024,
+        url_ttl: Optional[float] = 86400
+    ):
+        """
+        Initialize the blob cache and load its index.
+        
+        Args:
+            root: Directory for blobs and the index (caching is disabled if None)
+            max_bytes: Total size cap; least recently used blobs are evicted beyond it
+            url_ttl: Seconds a URL keeps pointing at the content downloaded from it,
+                so changed images are fetched again (never expires if None)
+        """
+        self.root = Path(root) if root else None
+        self.max_bytes = max_bytes
+        self.url_ttl = url_ttl
+        # URL -> (sha256, time the URL was downloaded)
+        self._urls: Dict[str, Tuple[str, float]] = {}
+        # sha256 -> size, ordered from least to most recently used
+        self._blobs: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        
+        self._hits = 0
+        self._misses = 0
+        self._bytes_saved = 0
+        self._evictions = 0
+        self._index_dirty = False
+        self._saving_index = False
+        
+        if self.root:
+            self._load_index()
+    
+    @classmethod
+    def from_config(cls, config) -> "BlobCache":
+        """
+        Create a blob cache from the `blob_cache` section of the config.
+        
+        Args:
+            config: ConfigManager instance
+        """
+        return cls(
+            root=config.get("blob_cache.path", "cache/blobs"),
+            max_bytes=config.get("blob_cache.max_bytes", 256 * 1024 * 1024),
+            url_ttl=config.get("blob_cache.url_ttl", 86400)
+        )
+    
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+    
+    @property
+    def _index_path(self) -> Path:
+        return self.root / "index.json"
+    
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+    
+    def _load_index(self):
+        """Load the URL and LRU index from disk, dropping entries whose blob is missing."""
+        try:
+            if not self._index_path.exists():
+                return
+            index = json.loads(self._index_path.read_text())
+            for digest, size in index.get("blobs", []):
+                if self._blob_path(digest).exists():
+                    self._blobs[digest] = size
+                    self._total_bytes += size
+            for url, value in index.get("urls", {}).items():
+                # Older indexes stored the bare digest; their age is unknown, so treat them as expired
+                digest, stored_at = (value, 0.0) if isinstance(value, str) else value
+                if digest in self._blobs:
+                    self._urls[url] = (digest, stored_at)
+            logger.info(f"Loaded blob cache index: {len(self._blobs)} blobs, {self._total_bytes} bytes")
+        except Exception as e:
+            logger.error(f"Error loading blob cache index: {e}")
+    
+    def _write_index(self, index: Dict[str, Any]):
+        """Write the index atomically."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._index_path.with_name("index.json.tmp")
+        tmp_path.write_text(json.dumps(index, separators=(",", ":")))
+        os.replace(tmp_path, self._index_path)
+    
+    def _write_blob(self, digest: str, data: bytes):
+        """Write a blob file atomically (skipped if it already exists)."""
+        path = self._blob_path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{digest}.{id(data)}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    
+    def _delete_blobs(self, digests):
+        for digest in digests:
+            try:
+                self._blob_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+    
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+    
+    async def _save_index(self):
+        """Persist the index; saves requested while one is running are coalesced into one more write."""
+        self._index_dirty = True
+        if self._saving_index:
+            return
+        self._saving_index = True
+        try:
+            while self._index_dirty:
+                self._index_dirty = False
+                index = {"urls": dict(self._urls), "blobs": list(self._blobs.items())}
+                await self._run(self._write_index, index)
+        except Exception as e:
+            logger.error(f"Error saving blob cache index: {e}")
+        finally:
+            self._saving_index = False
+    
+    async def get_by_hash(self, digest: str) -> Optional[bytes]:
+        """
+        Read a blob by its sha256 digest.
+        
+        Args:
+            digest: Hex sha256 of the content
+        
+        Returns:
+            The content, or None if it is not cached
+        """
+        if not self.enabled or digest not in self._blobs:
+            return None
+        try:
+            data = await self._run(self._blob_path(digest).read_bytes)
+        except FileNotFoundError:
+            self._forget(digest)
+            return None
+        self._blobs.move_to_end(digest)
+        return data
+    
+    async def get(self, url: str) -> Optional[bytes]:
+        """
+        Look up a URL in the cache.
+        
+        Args:
+            url: Image URL
+        
+        Returns:
+            The cached content, or None on a miss
+        """
+        data = None
+        cached = self._urls.get(url)
+        if cached is not None:
+            digest, stored_at = cached
+            if self.url_ttl is not None and time.time() - stored_at > self.url_ttl:
+                # The content at the URL may have changed; downloading it again refreshes the mapping
+                del self._urls[url]
+            else:
+                data = await self.get_by_hash(digest)
+        if data is None:
+            self._misses += 1
+            CACHE_LOOKUPS.inc(cache="blob", result="miss")
+        else:
+            self._hits += 1
+            CACHE_LOOKUPS.inc(cache="blob", result="hit")
+            self._bytes_saved += len(data)
+        return data
+    
+    async def put(self, url: str, data: bytes) -> str:
+        """
+        Store content for a URL, deduplicated by sha256, evicting old blobs if over the size cap.
+        
+        Args:
+            url: Image URL
+            data: Downloaded content
+        
+        Returns:
+            Hex sha256 of the content
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if not self.enabled:
+            return digest
+        
+        if digest not in self._blobs:
+            try:
+                await self._run(self._write_blob, digest, data)
+            except Exception as e:
+                logger.error(f"Error writing blob {digest}: {e}")
+                return digest
+            # A concurrent put of the same content may have added it during the write
+            if digest not in self._blobs:
+                self._blobs[digest] = len(data)
+                self._total_bytes += len(data)
+        self._blobs.move_to_end(digest)
+        self._urls[url] = (digest, time.time())
+        
+        await self._evict()
+        await self._save_index()
+        return digest
+    
+    async def get_or_fetch(self, url: str, fetch: Callable[[str], Awaitable[bytes]]) -> bytes:
+        """
+        Get a URL's content from the cache, downloading and storing it on a miss.
+        
+        Args:
+            url: Image URL
+            fetch: Coroutine function downloading a URL (its errors propagate)
+        
+        Returns:
+            The content
+        """
+        data = await self.get(url)
+        if data is not None:
+            return data
+        data = await fetch(url)
+        await self.put(url, data)
+        return data
+    
+    def _forget(self, digest: str):
+        size = self._blobs.pop(digest, None)
+        if size is not None:
+            self._total_bytes -= size
+        self._urls = {url: cached for url, cached in self._urls.items() if cached[0] != digest}
+    
+    async def _evict(self):
+        """Drop least recently used blobs until the cache fits in max_bytes."""
+        evicted = []
+        while self._total_bytes > self.max_bytes and self._blobs:
+            digest, size = self._blobs.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(digest)
+        if not evicted:
+            return
+        
+        evicted_set = set(evicted)
+        self._urls = {url: cached for url, cached in self._urls.items() if cached[0] not in evicted_set}
+        self._evictions += len(evicted)
+        await self._run(self._delete_blobs, evicted)
+        logger.debug(f"Evicted {len(evicted)} blobs from cache")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "blobs": len(self._blobs),
+            "urls": len(self._urls),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0,
+            "bytes_saved": self._bytes_saved,
+            "evictions": self._evictions
+        }
@@ -0,0 +1,127 @@
+import re
+from array import array
+from typing import Dict, List, Any, Optional, Tuple
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class CategoryIndex:
+    """Category name lookup and per-category emoji aggregates, built once per catalog refresh."""
+    
+    def __init__(
+        self,
+        categories: Optional[List[Dict[str, Any]]] = None,
+        emojis: Optional[List[Dict[str, Any]]] = None
+    ):
+        """
+        Build the index.
+        
+        Args:
+            categories: Category dictionaries from the API (id and name)
+            emojis: Emoji list to aggregate per category
+        """
+        self.emojis: List[Dict[str, Any]] = emojis or []
+        # category ID -> catalog positions, total count and animated count
+        self.positions: Dict[Any, array] = {}
+        self._animated: Dict[Any, int] = {}
+        for position, emoji in enumerate(self.emojis):
+            category = emoji.get("category")
+            positions = self.positions.get(category)
+            if positions is None:
+                positions = self.positions[category] = array("i")
+                self._animated[category] = 0
+            positions.append(position)
+            if emoji.get("image", "").endswith(".gif"):
+                self._animated[category] += 1
+        
+        self._set_categories(categories or [])
+        logger.info(f"Indexed {len(self.categories)} categories over {len(self.emojis)} emojis")
+    
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Reduce a category name to its lookup key (lowercase letters and digits only)."""
+        return re.sub(r"[^a-z0-9]", "", name.lower())
+    
+    def _set_categories(self, categories: List[Dict[str, Any]]):
+        """Build the name -> ID map, with aliases for punctuation and singular/plural forms."""
+        self.categories = categories
+        self._names: Dict[Any, str] = {}
+        ids: Dict[str, Any] = {}
+        aliases: Dict[str, Any] = {}
+        for category in categories:
+            category_id = category.get("id")
+            name = category.get("name", "")
+            self._names[category_id] = name
+            ids[name.lower()] = category_id
+            key = self.normalize(name)
+            if key:
+                aliases.setdefault(key, category_id)
+                alias = key[:-1] if key.endswith("s") else key + "s"
+                aliases.setdefault(alias, category_id)
+            if category_id is not None:
+                aliases.setdefault(str(category_id), category_id)
+        # Exact (case-insensitive) names win over aliases
+        aliases.update(ids)
+        self._ids = aliases
+    
+    def with_categories(self, categories: List[Dict[str, Any]]) -> "CategoryIndex":
+        """
+        Get an index with new category names, reusing this index's emoji aggregates.
+        
+        Args:
+            categories: Category dictionaries from the API
+        """
+        index = CategoryIndex.__new__(CategoryIndex)
+        index.emojis = self.emojis
+        index.positions = self.positions
+        index._animated = self._animated
+        index._set_categories(categories)
+        return index
+    
+    def resolve(self, name: str) -> Optional[Any]:
+        """
+        Resolve a category name (case-insensitive, ignoring punctuation and plurals) or ID.
+        
+        Args:
+            name: Name typed by the user
+        
+        Returns:
+            The category ID, or None if no category matches
+        """
+        category_id = self._ids.get(name.lower())
+        if category_id is None:
+            category_id = self._ids.get(self.normalize(name))
+        return category_id
+    
+    def name(self, category_id: Any) -> Optional[str]:
+        """Get a category's display name."""
+        return self._names.get(category_id)
+    
+    def count(self, category_id: Any) -> int:
+        """Number of emojis in a category."""
+        positions = self.positions.get(category_id)
+        return len(positions) if positions is not None else 0
+    
+    def animated_count(self, category_id: Any) -> int:
+        """Number of animated (GIF) emojis in a category."""
+        return self._animated.get(category_id, 0)
+    
+    def static_count(self, category_id: Any) -> int:
+        """Number of static emojis in a category."""
+        return self.count(category_id) - self.animated_count(category_id)
+    
+    def ranked(self) -> List[Tuple[Dict[str, Any], int]]:
+        """
+        Get the categories ordered by emoji count.
+        
+        Returns:
+            List of (category dictionary, emoji count), largest first
+        """
+        return sorted(
+            ((category, self.count(category.get("id"))) for category in self.categories),
+            key=lambda item: item[1],
+            reverse=True
+        )
+    
+    def __len__(self) -> int:
+        return len(self.categories)
@@ -0,0 +1,30 @@
+import time
+import discord
+from discord import app_commands
+from utils.metrics import REGISTRY
+
+COMMAND_DURATION = REGISTRY.histogram(
+    "bot_command_duration_seconds", "Slash command durations by command and status", ["command", "status"]
+)
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """Command tree that records the duration and outcome of every slash command."""
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["started"] = time.perf_counter()
+        return True
+    
+    def record(self, interaction: discord.Interaction, status: str):
+        """Record a finished command (called on completion and on error)."""
+        started = interaction.extras.pop("started", None)
+        if started is None or interaction.command is None:
+            return
+        COMMAND_DURATION.observe(
+            time.perf_counter() - started,
+            command=interaction.command.qualified_name,
+            status=status
+        )
+    
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        self.record(interaction, "error")
+        await super().on_error(interaction, error)
@@ -2,17 +2,30 @@ import json
 from pathlib import Path
 from typing import Any, Dict, Optional
 from utils.logger import setup_logger
+from utils.settings_store import SettingsStore
 
 logger = setup_logger(__name__)
 
 class ConfigManager:
     """Manages bot configuration from config.json and per-server settings."""
     
-    def __init__(self, config_path: str = "config.json", settings_path: str = "settings.json"):
+    def __init__(
+        self,
+        config_path: str = "config.json",
+        settings_path: str = "settings.db",
+        legacy_settings_path: Optional[str] = "settings.json"
+    ):
         self.config_path = Path(config_path)
         self.settings_path = Path(settings_path)
         self.config = self._load_config()
-        self.settings = self._load_settings()
+        # Per-server settings are served from memory and written to SQLite in batches
+        self.settings = SettingsStore(
+            settings_path,
+            legacy_path=legacy_settings_path,
+            flush_delay=self.get("settings.flush_delay", 1.0)
+        )
+        # Bumped on every config reload so derived data can be invalidated
+        self.version = 0
     
     def _load_config(self) -> Dict[str, Any]:
         """Load global configuration from config.json."""
@@ -27,18 +40,6 @@ class ConfigManager:
             logger.error(f"Error loading config: {e}")
             return self._get_default_config()
     
-    def _load_settings(self) -> Dict[str, Any]:
-        """Load per-server settings from settings.json."""
-        try:
-            if self.settings_path.exists():
-                with open(self.settings_path, 'r') as f:
-                    return json.load(f)
-            else:
-                return {}
-        except Exception as e:
-            logger.error(f"Error loading settings: {e}")
-            return {}
-    
     def _get_default_config(self) -> Dict[str, Any]:
         """Return default configuration."""
         return {
@@ -55,19 +56,91 @@ class ConfigManager:
                 "excluded_categories": [],
                 "adult_filter_enabled": True
             },
+            "cache": {
+                "snapshot_path": "cache/emoji_snapshot.json.gz"
+            },
+            "query_cache": {
+                "max_entries": 256,
+                "max_items": 200000
+            },
+            "logging": {
+                "level": "INFO",
+                "levels": {},
+                "queue_size": 10000,
+                "sample_interval": 10.0,
+                "sample_burst": 1
+            },
+            "metrics": {
+                "port": None,
+                "host": "127.0.0.1",
+                "loop_lag_interval": 0.5
+            },
+            "settings": {
+                "flush_delay": 1.0
+            },
+            "blob_cache": {
+                "path": "cache/blobs",
+                "max_bytes": 268435456,
+                "url_ttl": 86400
+            },
+            "http": {
+                "pool_size": 100,
+                "pool_size_per_host": 20,
+                "dns_cache_ttl": 300,
+                "keepalive_timeout": 30,
+                "timeout": 30,
+                "connect_timeout": 10
+            },
+            "backups": {
+                "path": "emoji_backups",
+                "io_workers": 2,
+                "read_ahead": 4
+            },
+            "upload": {
+                "download_concurrency": 4,
+                "prefetch_buffer": 8
+            },
+            "rate_limits": {
+                "emoji_create": {"limit": 30, "per": 60},
+                "emoji_delete": {"limit": 30, "per": 60},
+                "global_per_second": 40,
+                "max_retries": 3
+            },
+            "random": {
+                "seed": None,
+                "recent_memory": 50
+            },
             "defaults": {
                 "upload_limit": 50,
                 "search_limit": 10
             }
         }
     
-    def save_settings(self):
-        """Save per-server settings to settings.json."""
+    def reload_config(self) -> bool:
+        """
+        Reload global configuration from config.json.
+        
+        Unlike the initial load, a missing or invalid file keeps the current
+        configuration instead of falling back to the defaults.
+        
+        Returns:
+            True if the configuration was reloaded
+        """
         try:
-            with open(self.settings_path, 'w') as f:
-                json.dump(self.settings, f, indent=2)
+            with open(self.config_path, 'r') as f:
+                config = json.load(f)
         except Exception as e:
-            logger.error(f"Error saving settings: {e}")
+            logger.error(f"Error reloading config, keeping the current one: {e}")
+            return False
+        
+        self.config = config
+        self.version += 1
+        logger.info(f"Reloaded config (version {self.version})")
+        return True
+    
+    async def save_settings(self):
+        """Write pending per-server settings to disk now."""
+        await self.settings.flush()
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get a configuration value using dot notation (e.g., 'api.base_url')."""
@@ -82,16 +155,11 @@ class ConfigManager:
     
     def get_server_setting(self, server_id: int, key: str, default: Any = None) -> Any:
         """Get a per-server setting."""
-        server_settings = self.settings.get(str(server_id), {})
-        return server_settings.get(key, default)
+        return self.settings.get(server_id, key, default)
     
     def set_server_setting(self, server_id: int, key: str, value: Any):
-        """Set a per-server setting."""
-        server_id_str = str(server_id)
-        if server_id_str not in self.settings:
-            self.settings[server_id_str] = {}
-        self.settings[server_id_str][key] = value
-        self.save_settings()
+        """Set a per-server setting (readable at once, written to disk in the background)."""
+        self.settings.set(server_id, key, value)
     
     def can_members_add_emojis(self, server_id: int) -> bool:
         """Check if regular members can add emojis in this server."""
@@ -1,32 +1,349 @@
+import asyncio
+import gzip
+import json
+import operator
+import os
+import tempfile
 import time
-import aiohttp
-from typing import Dict, List, Optional, Any
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from utils.category_index import CategoryIndex
+from utils.http_client import HttpClient
 from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+from utils.search_index import SearchIndex
 
 logger = setup_logger(__name__)
 
+CACHE_LOOKUPS = REGISTRY.counter("bot_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+CACHE_REFRESHES = REGISTRY.counter("bot_cache_refreshes_total", "API cache refreshes by outcome", ["cache", "result"])
+CACHE_REFRESH_DURATION = REGISTRY.histogram(
+    "bot_cache_refresh_duration_seconds", "API cache refresh durations", ["cache"]
+)
+
+# Bump when the snapshot layout changes; snapshots with another version are ignored
+SNAPSHOT_VERSION = 1
+
+class _CacheEntry:
+    """A cached API response together with its refresh state."""
+    
+    def __init__(self, name: str, url_suffix: str):
+        """
+        Initialize a cache entry.
+        
+        Args:
+            name: Entry name used in logs and stats
+            url_suffix: Suffix appended to the base API URL to fetch this entry
+        """
+        self.name = name
+        self.url_suffix = url_suffix
+        self.data: Optional[List[Dict[str, Any]]] = None
+        self.timestamp: float = 0
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.refresh_count = 0
+        self.failure_count = 0
+        self.last_refresh_duration: Optional[float] = None
+        self.last_refresh_at: float = 0
+    
+    def clear(self):
+        """Drop the cached data (an in-flight refresh keeps running)."""
+        self.data = None
+        self.timestamp = 0
+
 class EmojiCache:
     """Caches API responses to improve performance and reduce API calls."""
     
-    def __init__(self, ttl: int = 3600):
+    def __init__(
+        self,
+        ttl: int = 3600,
+        snapshot_path: Optional[str] = None,
+        http_client: Optional[HttpClient] = None
+    ):
         """
         Initialize the emoji cache.
         
         Args:
             ttl: Time to live for cache entries in seconds (default: 1 hour)
+            snapshot_path: File to persist the cache to for warm restarts (disabled if None)
+            http_client: Shared HTTP client (a private one is created if None)
         """
         self.ttl = ttl
-        self._emojis_cache: Optional[Dict[str, Any]] = None
-        self._emojis_timestamp: float = 0
-        self._categories_cache: Optional[List[Dict[str, Any]]] = None
-        self._categories_timestamp: float = 0
-        self._packs_cache: Optional[List[Dict[str, Any]]] = None
-        self._packs_timestamp: float = 0
+        self.http_client = http_client if http_client is not None else HttpClient()
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self._emojis = _CacheEntry("emojis", "")
+        self._categories = _CacheEntry("categories", "?request=categories")
+        self._packs = _CacheEntry("packs", "/packs")
+        self.search_index = SearchIndex()
+        self.category_index = CategoryIndex()
+        # Bumped whenever the emoji list changes, so results derived from it can be invalidated
+        self.version = 0
+        # Set when cached data changed since the snapshot was last written
+        self._snapshot_dirty = False
+        self._saving_snapshot = False
+        self._refresh_listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+    
+    def add_refresh_listener(
+        self,
+        listener: Callable[[List[Dict[str, Any]], CategoryIndex], Optional[Callable[[], None]]]
+    ):
+        """
+        Register a callback to run whenever the emoji catalog is refreshed.
+        
+        Listeners are called from a worker thread with the new emoji list and
+        its category index, so they can precompute derived data without
+        blocking the event loop. A listener may return a callable, which is
+        run on the event loop in the same step that installs the new list, so
+        readers never see derived data from one list next to another list.
+        
+        Args:
+            listener: Callable taking the refreshed emoji list and category index,
+                optionally returning a callable that installs what it built
+        """
+        self._refresh_listeners.append(listener)
+    
+    def _build_derived(
+        self,
+        emojis: List[Dict[str, Any]],
+        categories: Optional[List[Dict[str, Any]]]
+    ) -> Tuple[SearchIndex, CategoryIndex, List[Callable[[], None]]]:
+        """
+        Build everything derived from a new emoji list (safe to run in a worker thread).
+        
+        Returns:
+            The search index, the category index and the listeners' install callables
+        """
+        search_index = SearchIndex(emojis)
+        category_index = CategoryIndex(categories, emojis)
+        installers = []
+        for listener in self._refresh_listeners:
+            try:
+                installer = listener(emojis, category_index)
+            except Exception as e:
+                logger.error(f"Error in cache refresh listener: {e}")
+                continue
+            if installer is not None:
+                installers.append(installer)
+        return search_index, category_index, installers
+    
+    def _install_derived(
+        self,
+        derived: Tuple[SearchIndex, CategoryIndex, List[Callable[[], None]]],
+        categories: Optional[List[Dict[str, Any]]]
+    ):
+        """
+        Install data built by _build_derived.
+        
+        Must run on the event loop, in the same step that installs the emoji
+        list. Categories refreshed while the data was being built are applied
+        to the new category index.
+        """
+        search_index, category_index, installers = derived
+        if self._categories.data is not categories:
+            category_index = category_index.with_categories(self._categories.data or [])
+        self.search_index = search_index
+        self.category_index = category_index
+        for installer in installers:
+            try:
+                installer()
+            except Exception as e:
+                logger.error(f"Error installing cache refresh listener data: {e}")
+    
+    def load_snapshot(self) -> bool:
+        """
+        Load the cache from the on-disk snapshot, if one exists.
+        
+        Entries keep the timestamp they were fetched at, so stale data is
+        still served but gets refreshed on the next request.
+        
+        Returns:
+            True if a snapshot was loaded
+        """
+        if not self.snapshot_path or not self.snapshot_path.exists():
+            return False
+        
+        try:
+            with gzip.open(self.snapshot_path, "rt", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading cache snapshot: {e}")
+            return False
+        
+        if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+            version = snapshot.get("version") if isinstance(snapshot, dict) else None
+            logger.warning(f"Ignoring cache snapshot with version {version}")
+            return False
+        
+        # Parse every entry before installing any, so a damaged snapshot leaves the cache empty
+        try:
+            loaded = []
+            for entry in (self._categories, self._packs, self._emojis):
+                data = snapshot[entry.name]["data"]
+                if data is not None and not isinstance(data, list):
+                    raise TypeError(f"{entry.name} is not a list")
+                loaded.append((entry, data, float(snapshot[entry.name]["timestamp"])))
+        except Exception as e:
+            logger.error(f"Error loading cache snapshot: invalid contents ({e!r})")
+            return False
+        
+        for entry, data, timestamp in loaded:
+            entry.data = data
+            entry.timestamp = timestamp
+        emojis = self._emojis.data
+        if emojis:
+            categories = self._categories.data
+            self._install_derived(self._build_derived(emojis, categories), categories)
+        self.version += 1
+        
+        logger.info(f"Loaded cache snapshot with {len(emojis or [])} emojis")
+        return True
+    
+    def _write_snapshot(self, snapshot: Dict[str, Any]):
+        """Write a snapshot to disk atomically (write to a unique temp file, then rename)."""
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=self.snapshot_path.parent, prefix=self.snapshot_path.name + ".", suffix=".tmp", delete=False
+        ) as raw:
+            tmp_path = raw.name
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=5) as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp_path, self.snapshot_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
+    async def save_snapshot(self):
+        """
+        Persist the current cache contents to the snapshot file without blocking the event loop.
+        
+        Skipped when nothing changed since the last write; entries refreshed with
+        identical data keep their older timestamp on disk, so after a restart they
+        are served as stale and revalidated once. Saves requested while one is
+        running are coalesced into one more write.
+        """
+        if not self.snapshot_path or not self._snapshot_dirty or self._saving_snapshot:
+            return
+        
+        self._saving_snapshot = True
+        try:
+            loop = asyncio.get_running_loop()
+            while self._snapshot_dirty:
+                self._snapshot_dirty = False
+                snapshot = {"version": SNAPSHOT_VERSION}
+                for entry in (self._emojis, self._categories, self._packs):
+                    snapshot[entry.name] = {"data": entry.data, "timestamp": entry.timestamp}
+                await loop.run_in_executor(None, self._write_snapshot, snapshot)
+                logger.debug(f"Saved cache snapshot to {self.snapshot_path}")
+        except Exception as e:
+            self._snapshot_dirty = True
+            logger.error(f"Error saving cache snapshot: {e}")
+        finally:
+            self._saving_snapshot = False
+    
+    async def refresh_all(self, api_url: str):
+        """
+        Fetch fresh emojis, categories and packs from the API.
+        
+        The entries are fetched concurrently and the snapshot is written once
+        after all of them finished.
+        
+        Args:
+            api_url: Base API URL
+        """
+        await asyncio.gather(*(
+            asyncio.shield(self._start_refresh(entry, api_url, save_snapshot=False))
+            for entry in (self._emojis, self._categories, self._packs)
+        ))
+        await self.save_snapshot()
     
     def _is_expired(self, timestamp: float) -> bool:
         """Check if a cache entry has expired."""
         return (time.time() - timestamp) > self.ttl
     
+    def _start_refresh(self, entry: _CacheEntry, api_url: str, save_snapshot: bool = True) -> asyncio.Task:
+        """Start a refresh of an entry, or join the one already in flight (single-flight)."""
+        if entry.refresh_task is None or entry.refresh_task.done():
+            entry.refresh_task = asyncio.create_task(self._refresh(entry, api_url, save_snapshot))
+        return entry.refresh_task
+    
+    async def _refresh(self, entry: _CacheEntry, api_url: str, save_snapshot: bool = True):
+        """
+        Fetch an entry from the API and store it; failures keep the previous data.
+        
+        Args:
+            entry: Entry to refresh
+            api_url: Base API URL
+            save_snapshot: Persist the snapshot afterwards (batched callers save once themselves)
+        """
+        logger.info(f"Fetching {entry.name} from API")
+        start = time.perf_counter()
+        try:
+            status, data = await self.http_client.get_json(f"{api_url}{entry.url_suffix}")
+            if status != 200:
+                logger.error(f"API request failed with status {status}")
+                entry.failure_count += 1
+                CACHE_REFRESHES.inc(cache=entry.name, result="error")
+                return
+            
+            loop = asyncio.get_running_loop()
+            # Comparing the emoji list is too slow for the event loop
+            if await loop.run_in_executor(None, operator.ne, data, entry.data):
+                self._snapshot_dirty = True
+            if entry is self._emojis:
+                # Build the indexes and catalog off the event loop
+                categories = self._categories.data
+                derived = await loop.run_in_executor(None, self._build_derived, data, categories)
+                # Swap them in together with the list and version, with no await in between
+                self._install_derived(derived, categories)
+            elif entry is self._categories:
+                # Names only; the per-category aggregates depend on the emojis
+                self.category_index = self.category_index.with_categories(data)
+            
+            entry.data = data
+            entry.timestamp = time.time()
+            entry.refresh_count += 1
+            if entry is self._emojis:
+                self.version += 1
+            CACHE_REFRESHES.inc(cache=entry.name, result="ok")
+            logger.info(f"Cached {len(data)} {entry.name}")
+        except Exception as e:
+            logger.error(f"Error fetching {entry.name}: {e}")
+            entry.failure_count += 1
+            CACHE_REFRESHES.inc(cache=entry.name, result="error")
+            return
+        finally:
+            entry.last_refresh_duration = time.perf_counter() - start
+            entry.last_refresh_at = time.time()
+            CACHE_REFRESH_DURATION.observe(entry.last_refresh_duration, cache=entry.name)
+        
+        if save_snapshot:
+            await self.save_snapshot()
+    
+    async def _get(self, entry: _CacheEntry, api_url: str, force_refresh: bool) -> List[Dict[str, Any]]:
+        """
+        Get an entry, serving stale data while it is revalidated in the background.
+        
+        Callers only wait for the API when there is no cached data yet or a
+        refresh is forced; concurrent waiters share a single request.
+        """
+        if not force_refresh and entry.data:
+            if self._is_expired(entry.timestamp):
+                logger.debug(f"Returning stale {entry.name} from cache while refreshing")
+                CACHE_LOOKUPS.inc(cache=entry.name, result="stale")
+                self._start_refresh(entry, api_url)
+            else:
+                logger.debug(f"Returning {entry.name} from cache")
+                CACHE_LOOKUPS.inc(cache=entry.name, result="hit")
+            return entry.data
+        
+        CACHE_LOOKUPS.inc(cache=entry.name, result="miss")
+        # Shield the shared task so one cancelled caller does not cancel it for everyone
+        await asyncio.shield(self._start_refresh(entry, api_url))
+        return entry.data if entry.data else []
+    
     async def get_emojis(self, api_url: str, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Get all emojis from cache or API.
@@ -38,26 +355,7 @@ class EmojiCache:
         Returns:
             List of emoji dictionaries
         """
-        if not force_refresh and self._emojis_cache and not self._is_expired(self._emojis_timestamp):
-            logger.debug("Returning emojis from cache")
-            return self._emojis_cache
-        
-        logger.info("Fetching emojis from API")
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url) as response:
-                    if response.status == 200:
-                        emojis = await response.json()
-                        self._emojis_cache = emojis
-                        self._emojis_timestamp = time.time()
-                        logger.info(f"Cached {len(emojis)} emojis")
-                        return emojis
-                    else:
-                        logger.error(f"API request failed with status {response.status}")
-                        return self._emojis_cache if self._emojis_cache else []
-        except Exception as e:
-            logger.error(f"Error fetching emojis: {e}")
-            return self._emojis_cache if self._emojis_cache else []
+        return await self._get(self._emojis, api_url, force_refresh)
     
     async def get_categories(self, api_url: str, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """
@@ -70,26 +368,22 @@ class EmojiCache:
         Returns:
             List of category dictionaries
         """
-        if not force_refresh and self._categories_cache and not self._is_expired(self._categories_timestamp):
-            logger.debug("Returning categories from cache")
-            return self._categories_cache
+        return await self._get(self._categories, api_url, force_refresh)
+    
+    async def resolve_category(self, api_url: str, name: str) -> Optional[Any]:
+        """
+        Resolve a category name typed by a user to its ID.
         
-        logger.info("Fetching categories from API")
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{api_url}?request=categories") as response:
-                    if response.status == 200:
-                        categories = await response.json()
-                        self._categories_cache = categories
-                        self._categories_timestamp = time.time()
-                        logger.info(f"Cached {len(categories)} categories")
-                        return categories
-                    else:
-                        logger.error(f"API request failed with status {response.status}")
-                        return self._categories_cache if self._categories_cache else []
-        except Exception as e:
-            logger.error(f"Error fetching categories: {e}")
-            return self._categories_cache if self._categories_cache else []
+        Args:
+            api_url: Base API URL
+            name: Category name (case-insensitive; punctuation and plurals are ignored)
+            
+        Returns:
+            The category ID, or None if no category matches
+        """
+        # Makes sure categories are loaded (and revalidated when stale)
+        await self.get_categories(api_url)
+        return self.category_index.resolve(name)
     
     async def get_packs(self, api_url: str, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """
@@ -102,56 +396,36 @@ class EmojiCache:
         Returns:
             List of pack dictionaries
         """
-        if not force_refresh and self._packs_cache and not self._is_expired(self._packs_timestamp):
-            logger.debug("Returning packs from cache")
-            return self._packs_cache
-        
-        logger.info("Fetching packs from API")
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{api_url}/packs") as response:
-                    if response.status == 200:
-                        packs = await response.json()
-                        self._packs_cache = packs
-                        self._packs_timestamp = time.time()
-                        logger.info(f"Cached {len(packs)} packs")
-                        return packs
-                    else:
-                        logger.error(f"API request failed with status {response.status}")
-                        return self._packs_cache if self._packs_cache else []
-        except Exception as e:
-            logger.error(f"Error fetching packs: {e}")
-            return self._packs_cache if self._packs_cache else []
+        return await self._get(self._packs, api_url, force_refresh)
     
     def clear_cache(self):
         """Clear all cached data."""
         logger.info("Clearing all caches")
-        self._emojis_cache = None
-        self._emojis_timestamp = 0
-        self._categories_cache = None
-        self._categories_timestamp = 0
-        self._packs_cache = None
-        self._packs_timestamp = 0
+        for entry in (self._emojis, self._categories, self._packs):
+            entry.clear()
+        self.search_index = SearchIndex()
+        self.category_index = CategoryIndex()
+        self.version += 1
+    
+    def _entry_stats(self, entry: _CacheEntry) -> Dict[str, Any]:
+        """Get statistics for a single cache entry."""
+        now = time.time()
+        return {
+            "cached": entry.data is not None,
+            "count": len(entry.data) if entry.data else 0,
+            "age_seconds": now - entry.timestamp if entry.data else 0,
+            "expired": self._is_expired(entry.timestamp) if entry.data else True,
+            "refreshing": entry.refresh_task is not None and not entry.refresh_task.done(),
+            "refresh_count": entry.refresh_count,
+            "failure_count": entry.failure_count,
+            "last_refresh_seconds": entry.last_refresh_duration,
+            "last_refresh_age_seconds": now - entry.last_refresh_at if entry.last_refresh_at else None
+        }
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         return {
-            "emojis": {
-                "cached": self._emojis_cache is not None,
-                "count": len(self._emojis_cache) if self._emojis_cache else 0,
-                "age_seconds": time.time() - self._emojis_timestamp if self._emojis_cache else 0,
-                "expired": self._is_expired(self._emojis_timestamp) if self._emojis_cache else True
-            },
-            "categories": {
-                "cached": self._categories_cache is not None,
-                "count": len(self._categories_cache) if self._categories_cache else 0,
-                "age_seconds": time.time() - self._categories_timestamp if self._categories_cache else 0,
-                "expired": self._is_expired(self._categories_timestamp) if self._categories_cache else True
-            },
-            "packs": {
-                "cached": self._packs_cache is not None,
-                "count": len(self._packs_cache) if self._packs_cache else 0,
-                "age_seconds": time.time() - self._packs_timestamp if self._packs_cache else 0,
-                "expired": self._is_expired(self._packs_timestamp) if self._packs_cache else True
-            }
+            "emojis": self._entry_stats(self._emojis),
+            "categories": self._entry_stats(self._categories),
+            "packs": self._entry_stats(self._packs)
         }
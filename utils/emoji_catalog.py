@@ -0,0 +1,200 @@
+import heapq
+from array import array
+from itertools import compress
+from typing import Callable, Dict, List, Any, Optional, Iterable, Tuple
+from utils import vector_engine
+from utils.logger import setup_logger
+from utils.vector_engine import VectorEngine
+
+logger = setup_logger(__name__)
+
+# Stored in the category column for emojis without a category
+NO_CATEGORY = -1
+
+# Length of the precomputed favorites rankings (global and per category)
+TOP_K = 100
+
+class EmojiCatalog:
+    """Columnar view of the emoji catalog with precomputed per-emoji filter verdicts."""
+    
+    def __init__(
+        self,
+        emojis: List[Dict[str, Any]],
+        is_adult: Callable[[Dict[str, Any]], bool],
+        is_quality: Callable[[Dict[str, Any]], bool],
+        config_version: int = 0,
+        top_k: int = TOP_K,
+        category_positions: Optional[Dict[Any, array]] = None,
+        use_numpy: bool = True
+    ):
+        """
+        Build the catalog columns.
+        
+        Args:
+            emojis: List of emoji dictionaries, in catalog order
+            is_adult: Predicate flagging adult content
+            is_quality: Predicate flagging emojis that meet quality standards
+            config_version: Config version the verdicts were computed against
+            top_k: Length of the precomputed favorites rankings
+            category_positions: Positions of each category's emojis (from the
+                CategoryIndex of the same list), used to select by category
+                without scanning the whole catalog
+            use_numpy: Filter and sort with NumPy when it is installed
+        """
+        self.emojis = emojis
+        self.config_version = config_version
+        self.top_k = top_k
+        self.category_positions = category_positions
+        
+        size = len(emojis)
+        self.adult = bytearray(size)
+        self.quality = bytearray(size)
+        self.animated = bytearray(size)
+        self.category = array("i", bytes(4 * size))
+        self.faves = array("i", bytes(4 * size))
+        self.filesize = array("i", bytes(4 * size))
+        self._positions: Dict[int, int] = {}
+        
+        for i, emoji in enumerate(emojis):
+            self.adult[i] = is_adult(emoji)
+            self.quality[i] = is_quality(emoji)
+            self.animated[i] = emoji.get("image", "").endswith(".gif")
+            category = emoji.get("category")
+            self.category[i] = category if isinstance(category, int) else NO_CATEGORY
+            self.faves[i] = emoji.get("faves", 0) or 0
+            self.filesize[i] = emoji.get("filesize", 0) or 0
+            self._positions[id(emoji)] = i
+        
+        # Emojis that pass both the quality and the adult content filter
+        self.safe = bytes(q and not a for q, a in zip(self.quality, self.adult))
+        self.vector: Optional[VectorEngine] = None
+        if use_numpy and vector_engine.available():
+            self.vector = VectorEngine(self)
+        self._rankings = self._build_rankings()
+        # (category, adult_filter) -> eligible positions, filled on first use
+        self._eligible: Dict[Tuple[Optional[int], bool], array] = {}
+        logger.info(
+            f"Built catalog of {size} emojis "
+            f"({sum(self.adult)} adult, {sum(self.quality)} quality)"
+        )
+    
+    def _build_rankings(self) -> Dict[bool, Dict[Optional[int], array]]:
+        """
+        Rank the top_k most favorited emojis globally and per category, with and without the adult filter.
+        
+        One stable sort of the whole catalog is partitioned by category, so
+        ties keep catalog order, exactly like sorting the filtered list.
+        """
+        if self.vector is not None:
+            order = self.vector.sort(range(len(self.emojis)), "favorites")
+        else:
+            order = sorted(range(len(self.emojis)), key=self.faves.__getitem__, reverse=True)
+        category_column = self.category
+        top_k = self.top_k
+        rankings = {}
+        for adult_filter, mask in ((True, self.safe), (False, self.quality)):
+            ranked: Dict[Optional[int], array] = {None: array("i")}
+            for i in order:
+                if not mask[i]:
+                    continue
+                for key in (None, category_column[i]):
+                    positions = ranked.get(key)
+                    if positions is None:
+                        positions = ranked[key] = array("i")
+                    if len(positions) < top_k:
+                        positions.append(i)
+            rankings[adult_filter] = ranked
+        return rankings
+    
+    def __len__(self) -> int:
+        return len(self.emojis)
+    
+    def position(self, emoji: Dict[str, Any]) -> Optional[int]:
+        """Get the catalog position of an emoji dictionary, or None if it is not in the catalog."""
+        return self._positions.get(id(emoji))
+    
+    def select(
+        self,
+        category: Optional[int] = None,
+        include_animated: bool = True,
+        adult_filter: bool = True,
+        min_favorites: Optional[int] = None,
+        positions: Optional[Iterable[int]] = None
+    ) -> List[int]:
+        """
+        Get the positions of emojis matching the given criteria.
+        
+        Args:
+            category: Filter by category ID
+            include_animated: Include animated (GIF) emojis
+            adult_filter: Filter out adult content
+            min_favorites: Minimum number of favorites
+            positions: Restrict the selection to these positions (default: whole catalog)
+        
+        Returns:
+            Matching positions in catalog order
+        """
+        if positions is None and self.vector is not None:
+            return self.vector.select(category, include_animated, adult_filter, min_favorites)
+        
+        mask = self.safe if adult_filter else self.quality
+        if positions is None and category is not None and self.category_positions is not None:
+            selected: Iterable[int] = (i for i in self.category_positions.get(category, ()) if mask[i])
+            category = None
+        elif positions is None:
+            selected = compress(range(len(self.emojis)), mask)
+        else:
+            selected = (i for i in positions if mask[i])
+        
+        if category is not None:
+            category_column = self.category
+            selected = (i for i in selected if category_column[i] == category)
+        if not include_animated:
+            animated = self.animated
+            selected = (i for i in selected if not animated[i])
+        if min_favorites is not None:
+            faves = self.faves
+            selected = (i for i in selected if faves[i] >= min_favorites)
+        
+        return list(selected)
+    
+    def top(self, limit: int, category: Optional[int] = None, adult_filter: bool = True) -> List[int]:
+        """
+        Get the positions of the most favorited emojis.
+        
+        Served from the precomputed rankings when limit fits in top_k,
+        otherwise by a partial heap selection over the matching emojis.
+        
+        Args:
+            limit: Maximum number of positions to return
+            category: Filter by category ID
+            adult_filter: Filter out adult content
+        
+        Returns:
+            Positions ordered by favorites (ties in catalog order)
+        """
+        if limit <= 0:
+            return []
+        if limit <= self.top_k:
+            return list(self._rankings[adult_filter].get(category, ())[:limit])
+        positions = self.select(category=category, adult_filter=adult_filter)
+        if self.vector is not None:
+            return self.vector.top(positions, limit)
+        return heapq.nlargest(limit, positions, key=self.faves.__getitem__)
+    
+    def eligible(self, category: Optional[int] = None, adult_filter: bool = True) -> array:
+        """
+        Get the positions of all emojis passing the filters, cached for the lifetime of the catalog.
+        
+        Args:
+            category: Filter by category ID
+            adult_filter: Filter out adult content
+        
+        Returns:
+            Positions in catalog order (do not modify)
+        """
+        key = (category, adult_filter)
+        positions = self._eligible.get(key)
+        if positions is None:
+            positions = self._eligible[key] = array("i", self.select(category=category, adult_filter=adult_filter))
+        return positions
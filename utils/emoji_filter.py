@@ -1,8 +1,13 @@
+import heapq
 import json
-import re
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from utils.logger import setup_logger
+from utils.category_index import CategoryIndex
+from utils.emoji_catalog import EmojiCatalog
+from utils.emoji_sampler import EmojiSampler
+from utils.filter_policy import FilterPolicy
+from utils.keyword_matcher import KeywordMatcher
 
 logger = setup_logger(__name__)
 
@@ -18,6 +23,82 @@ class EmojiFilter:
         """
         self.config = config_manager
         self.adult_keywords = self._load_adult_keywords()
+        self.adult_matcher = KeywordMatcher(self.adult_keywords)
+        self._policy = FilterPolicy.from_config(self.config, self.adult_matcher)
+        self.catalog: Optional[EmojiCatalog] = None
+        self.sampler = EmojiSampler(
+            seed=self.config.get("random.seed"),
+            recent_memory=self.config.get("random.recent_memory", 50)
+        )
+    
+    @property
+    def policy(self) -> FilterPolicy:
+        """The compiled filter settings, recompiled when the config has been reloaded."""
+        if self._policy.config_version != self.config.version:
+            self._policy = FilterPolicy.from_config(self.config, self.adult_matcher)
+        return self._policy
+    
+    def _build_catalog(self, emojis: List[Dict[str, Any]], category_positions) -> EmojiCatalog:
+        policy = self.policy
+        return EmojiCatalog(
+            emojis,
+            is_adult=policy.is_adult,
+            is_quality=policy.is_quality,
+            config_version=policy.config_version,
+            category_positions=category_positions
+        )
+    
+    def prepare_catalog(
+        self,
+        emojis: List[Dict[str, Any]],
+        category_index: Optional[CategoryIndex] = None
+    ) -> Callable[[], None]:
+        """
+        Precompute filter verdicts for a (refreshed) emoji list without installing them.
+        
+        Meant as an emoji cache refresh listener: the catalog is built in the
+        worker thread and installed by the returned callable on the event loop.
+        
+        Args:
+            emojis: List of emoji dictionaries
+            category_index: Category index of the same list, whose per-category
+                positions are reused for category filters
+        
+        Returns:
+            Callable that installs the catalog
+        """
+        category_positions = None
+        if category_index is not None and category_index.emojis is emojis:
+            category_positions = category_index.positions
+        catalog = self._build_catalog(emojis, category_positions)
+        
+        def install():
+            self.catalog = catalog
+        
+        return install
+    
+    def rebuild_catalog(self, emojis: List[Dict[str, Any]], category_index: Optional[CategoryIndex] = None):
+        """
+        Precompute filter verdicts for a (refreshed) emoji list and install them at once.
+        
+        Args:
+            emojis: List of emoji dictionaries
+            category_index: Category index of the same list, whose per-category
+                positions are reused for category filters
+        """
+        self.prepare_catalog(emojis, category_index)()
+    
+    def _get_catalog(self, emojis: List[Dict[str, Any]]) -> Optional[EmojiCatalog]:
+        """Get the precomputed catalog, rebuilding it if the config changed since it was built."""
+        catalog = self.catalog
+        if catalog is None:
+            return None
+        if catalog.config_version != self.config.version:
+            if emojis is not catalog.emojis:
+                return None
+            self.catalog = self._build_catalog(emojis, catalog.category_positions)
+            catalog = self.catalog
+        return catalog
     
     def _load_adult_keywords(self) -> List[str]:
         """Load adult content keywords from JSON file."""
@@ -35,70 +116,41 @@ class EmojiFilter:
             logger.error(f"Error loading adult keywords: {e}")
             return []
     
-    def _contains_adult_content(self, emoji: Dict[str, Any]) -> bool:
-        """
-        Check if emoji contains adult content.
-        
-        Args:
-            emoji: Emoji dictionary from API
-            
-        Returns:
-            True if adult content detected
-        """
-        if not self.adult_keywords:
+    def _passes_filters(
+        self,
+        emoji: Dict[str, Any],
+        policy: FilterPolicy,
+        catalog: Optional[EmojiCatalog],
+        category: Optional[int],
+        include_animated: bool,
+        adult_filter: bool,
+        min_favorites: Optional[int]
+    ) -> bool:
+        """Check a single emoji against the filters, using precomputed verdicts when available."""
+        # Category filter
+        if category is not None and emoji.get("category") != category:
             return False
         
-        # Check title and description
-        title = emoji.get("title", "").lower()
-        description = emoji.get("description", "").lower()
-        slug = emoji.get("slug", "").lower()
-        
-        for keyword in self.adult_keywords:
-            if keyword in title or keyword in description or keyword in slug:
-                logger.debug(f"Adult content detected in emoji: {title} (keyword: {keyword})")
-                return True
-        
-        return False
-    
-    def _is_quality_emoji(self, emoji: Dict[str, Any]) -> bool:
-        """
-        Check if emoji meets quality standards.
+        # Animated filter
+        if not include_animated and emoji.get("image", "").endswith(".gif"):
+            return False
         
-        Args:
-            emoji: Emoji dictionary from API
-            
-        Returns:
-            True if emoji meets quality standards
-        """
-        # Check minimum favorites
-        min_faves = self.config.get("emoji_quality.min_favorites", 0)
-        faves = emoji.get("faves", 0)
-        if faves < min_faves:
+        # Favorites filter
+        if min_favorites is not None and emoji.get("faves", 0) < min_favorites:
             return False
         
-        # Check file size (if available)
-        filesize = emoji.get("filesize", 0)
-        if filesize > 0:
-            min_size = self.config.get("emoji_quality.min_file_size", 100)
-            max_size = self.config.get("emoji_quality.max_file_size", 256000)
-            if filesize < min_size or filesize > max_size:
-                logger.debug(f"Emoji {emoji.get('title')} rejected: filesize {filesize}")
+        position = catalog.position(emoji) if catalog is not None else None
+        if position is not None:
+            if adult_filter and catalog.adult[position]:
                 return False
+            return bool(catalog.quality[position])
         
-        # Check for valid title (not gibberish)
-        title = emoji.get("title", "")
-        if len(title) < 2 or len(title) > 100:
+        # Adult content filter
+        if adult_filter and policy.is_adult(emoji):
             return False
         
-        # Check if title is mostly alphanumeric or underscores
-        if not re.match(r'^[a-zA-Z0-9_\-\s]+$', title):
-            # Allow some special characters but reject if too many
-            special_chars = len(re.findall(r'[^a-zA-Z0-9_\-\s]', title))
-            if special_chars > len(title) * 0.3:  # More than 30% special chars
-                logger.debug(f"Emoji {title} rejected: too many special characters")
-                return False
-        
-        return True
+        # Quality filter
+        return policy.is_quality(emoji)
     
     def filter_emojis(
         self,
@@ -118,47 +170,47 @@ class EmojiFilter:
             include_animated: Include animated (GIF) emojis
             adult_filter: Filter out adult content
             min_favorites: Minimum number of favorites
-            search_query: Search query to match against title/description
+            search_query: Search query to match against title/slug/description
             
         Returns:
             Filtered list of emojis
         """
-        filtered = []
+        policy = self.policy
+        adult_filter = adult_filter and policy.adult_filter_enabled
+        catalog = self._get_catalog(emojis)
         
-        for emoji in emojis:
-            # Category filter
-            if category is not None and emoji.get("category") != category:
-                continue
-            
-            # Animated filter
-            if not include_animated and emoji.get("image", "").endswith(".gif"):
-                continue
-            
-            # Adult content filter
-            if adult_filter and self.config.get("emoji_quality.adult_filter_enabled", True):
-                if self._contains_adult_content(emoji):
-                    continue
-            
-            # Quality filter
-            if not self._is_quality_emoji(emoji):
-                continue
-            
-            # Favorites filter
-            if min_favorites is not None:
-                if emoji.get("faves", 0) < min_favorites:
-                    continue
-            
-            # Search query filter
-            if search_query:
-                query_lower = search_query.lower()
+        if catalog is not None and emojis is catalog.emojis:
+            # Whole catalog: mask lookup over the precomputed columns
+            positions = catalog.select(
+                category=category,
+                include_animated=include_animated,
+                adult_filter=adult_filter,
+                min_favorites=min_favorites
+            )
+            candidates = [emojis[i] for i in positions]
+        else:
+            candidates = [
+                emoji for emoji in emojis
+                if self._passes_filters(emoji, policy, catalog, category, include_animated, adult_filter, min_favorites)
+            ]
+        
+        if search_query:
+            query_lower = search_query.lower()
+            filtered = []
+            for emoji in candidates:
                 title = emoji.get("title", "").lower()
+                slug = emoji.get("slug", "").lower()
                 description = emoji.get("description", "").lower()
-                if query_lower not in title and query_lower not in description:
-                    continue
-            
-            filtered.append(emoji)
+                if query_lower in title or query_lower in slug or query_lower in description:
+                    filtered.append(emoji)
+        else:
+            filtered = candidates
         
-        logger.info(f"Filtered {len(emojis)} emojis to {len(filtered)} emojis")
+        # Called for every command; sampled so it does not flood the log under load
+        logger.info(
+            f"Filtered {len(emojis)} emojis to {len(filtered)} emojis",
+            extra={"sample_key": "filter_emojis"}
+        )
         return filtered
     
     def sort_emojis(
@@ -176,6 +228,16 @@ class EmojiFilter:
         Returns:
             Sorted list of emojis
         """
+        catalog = self.catalog
+        if catalog is not None and catalog.vector is not None:
+            # Vectorized argsort over the catalog columns when every emoji is in the catalog
+            position = catalog.position
+            positions = [position(emoji) for emoji in emojis]
+            if None not in positions:
+                order = catalog.vector.sort(positions, sort_by)
+                if order is not None:
+                    return [catalog.emojis[i] for i in order]
+        
         if sort_by == "favorites":
             return sorted(emojis, key=lambda e: e.get("faves", 0), reverse=True)
         elif sort_by == "title":
@@ -207,6 +269,43 @@ class EmojiFilter:
         Returns:
             List of trending emojis
         """
+        catalog = self._get_catalog(emojis)
+        if catalog is not None and emojis is catalog.emojis:
+            adult_filter = self.policy.adult_filter_enabled
+            positions = catalog.top(limit, category=category, adult_filter=adult_filter)
+            return [emojis[i] for i in positions]
+        
+        # Ad-hoc lists: partial selection instead of sorting everything
+        filtered = self.filter_emojis(emojis, category=category, adult_filter=True)
+        return heapq.nlargest(limit, filtered, key=lambda e: e.get("faves", 0))
+    
+    def get_random_emojis(
+        self,
+        emojis: List[Dict[str, Any]],
+        count: int = 5,
+        category: Optional[int] = None,
+        guild_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get random emojis that pass the filters.
+        
+        Args:
+            emojis: List of emoji dictionaries
+            count: Number of emojis to return
+            category: Optional category filter
+            guild_id: Guild asking, so emojis it was shown recently are avoided
+            
+        Returns:
+            List of random emojis
+        """
+        catalog = self._get_catalog(emojis)
+        if catalog is not None and emojis is catalog.emojis:
+            # Sample straight from the cached eligible positions
+            eligible = catalog.eligible(category=category, adult_filter=self.policy.adult_filter_enabled)
+            positions = self.sampler.sample(
+                eligible, count, guild_id=guild_id, key=lambda i: emojis[i].get("id", i)
+            )
+            return [emojis[i] for i in positions]
+        
         filtered = self.filter_emojis(emojis, category=category, adult_filter=True)
-        sorted_emojis = self.sort_emojis(filtered, sort_by="favorites")
-        return sorted_emojis[:limit]
+        return self.sampler.sample(filtered, count, guild_id=guild_id, key=lambda e: e.get("id", id(e)))
@@ -0,0 +1,101 @@
+import random
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Hashable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class EmojiSampler:
+    """
+    Draws random emojis from an eligible list without copying or shuffling it.
+    
+    Picks are made by rejection sampling over indexes, so a draw costs
+    O(count) no matter how large the list is. Each guild can remember the
+    emojis it was recently shown, and those are skipped while enough other
+    emojis are available.
+    """
+    
+    def __init__(self, seed: Optional[int] = None, recent_memory: int = 50, max_guilds: int = 1000):
+        """
+        Initialize the sampler.
+        
+        Args:
+            seed: Seed for the random generator (for reproducible draws in tests)
+            recent_memory: Number of recently shown emojis remembered per guild (0 disables it)
+            max_guilds: Number of guilds whose memory is kept (least recently used are dropped)
+        """
+        self.rng = random.Random(seed)
+        self.recent_memory = recent_memory
+        self.max_guilds = max_guilds
+        self._recent: "OrderedDict[int, Tuple[Deque[Hashable], Set[Hashable]]]" = OrderedDict()
+    
+    def _guild_recent(self, guild_id: int) -> Tuple[Deque[Hashable], Set[Hashable]]:
+        recent = self._recent.get(guild_id)
+        if recent is None:
+            recent = self._recent[guild_id] = (deque(), set())
+            if len(self._recent) > self.max_guilds:
+                self._recent.popitem(last=False)
+        else:
+            self._recent.move_to_end(guild_id)
+        return recent
+    
+    def _remember(self, guild_id: int, keys: List[Hashable]):
+        order, seen = self._guild_recent(guild_id)
+        for key in keys:
+            if key in seen:
+                continue
+            order.append(key)
+            seen.add(key)
+            if len(order) > self.recent_memory:
+                seen.discard(order.popleft())
+    
+    def sample(
+        self,
+        eligible: Sequence[T],
+        count: int,
+        guild_id: Optional[int] = None,
+        key: Callable[[T], Hashable] = lambda item: item
+    ) -> List[T]:
+        """
+        Draw up to count distinct items.
+        
+        Args:
+            eligible: Items to draw from (not modified or copied)
+            count: Number of items to draw
+            guild_id: Guild whose recently shown items should be avoided (and updated)
+            key: Stable identity of an item, used by the recently shown memory
+        
+        Returns:
+            The drawn items in random order
+        """
+        size = len(eligible)
+        count = max(0, min(count, size))
+        use_memory = guild_id is not None and self.recent_memory > 0
+        recent: Set[Hashable] = self._guild_recent(guild_id)[1] if use_memory else set()
+        
+        picked: List[T] = []
+        chosen: Set[int] = set()
+        attempts = 0
+        max_attempts = 8 * count + 32
+        while len(picked) < count and attempts < max_attempts:
+            attempts += 1
+            index = self.rng.randrange(size)
+            if index in chosen:
+                continue
+            item = eligible[index]
+            if recent and key(item) in recent:
+                continue
+            chosen.add(index)
+            picked.append(item)
+        
+        if len(picked) < count:
+            # Mostly recently shown (or a dense draw): top up ignoring the memory
+            for index in self.rng.sample(range(size), min(size, count + len(chosen))):
+                if len(picked) == count:
+                    break
+                if index not in chosen:
+                    chosen.add(index)
+                    picked.append(eligible[index])
+        
+        if use_memory:
+            self._remember(guild_id, [key(item) for item in picked])
+        return picked
@@ -0,0 +1,326 @@
+import asyncio
+import time
+import discord
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+
+logger = setup_logger(__name__)
+
+EMOJI_CALLS = REGISTRY.counter(
+    "bot_discord_emoji_calls_total", "Discord emoji API calls by route and outcome", ["route", "outcome"]
+)
+EMOJI_CALL_DURATION = REGISTRY.histogram(
+    "bot_discord_emoji_call_duration_seconds", "Discord emoji API call durations", ["route"]
+)
+
+# Route names for the emoji mutation buckets
+CREATE = "create"
+DELETE = "delete"
+
+class TokenBucket:
+    """Token bucket tracking how many calls a rate-limit bucket still allows."""
+    
+    def __init__(self, limit: int, per: float):
+        """
+        Initialize the bucket (full).
+        
+        Args:
+            limit: Number of calls allowed per window
+            per: Window length in seconds
+        """
+        self.limit = limit
+        self.per = per
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+    
+    @property
+    def rate(self) -> float:
+        """Tokens regained per second."""
+        return self.limit / self.per
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def delay(self) -> float:
+        """Seconds until a call can be made (0 if one can be made now)."""
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self.paused_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+    
+    def take(self):
+        """Consume a token for a call that is being made now."""
+        self._refill(time.monotonic())
+        self.tokens -= 1
+    
+    def pause(self, seconds: float):
+        """Block the bucket for the given time (after Discord reported a rate limit)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0)
+    
+    def time_for(self, calls: int) -> float:
+        """Estimate the seconds needed to make the given number of calls."""
+        if calls <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self.paused_until - now)
+        missing = calls - self.tokens
+        return wait + max(0.0, missing / self.rate)
+
+class _Job:
+    """A queued emoji mutation."""
+    
+    def __init__(self, route: str, call: Callable[[], Awaitable[Any]], future: asyncio.Future):
+        self.route = route
+        self.call = call
+        self.future = future
+        self.attempts = 0
+
+class _GuildQueue:
+    """Pending mutations and rate-limit buckets for one guild."""
+    
+    def __init__(self, buckets: Dict[str, TokenBucket]):
+        self.jobs: Deque[_Job] = deque()
+        self.buckets = buckets
+        self.busy = False
+
+class EmojiMutationScheduler:
+    """
+    Queues emoji create/delete calls per guild and dispatches them within Discord's rate limits.
+    
+    Each guild has its own buckets for the create and delete routes, tracked
+    proactively so calls are only made when the bucket has room instead of
+    relying on 429 responses. Guilds are served round-robin, one call in
+    flight per guild, and all calls also share a global bucket.
+    """
+    
+    def __init__(
+        self,
+        create_limit: int = 30,
+        create_per: float = 60,
+        delete_limit: int = 30,
+        delete_per: float = 60,
+        global_limit: int = 40,
+        max_retries: int = 3
+    ):
+        """
+        Initialize the scheduler (the dispatcher starts on first use).
+        
+        Args:
+            create_limit: Emoji creations allowed per guild per window
+            create_per: Creation window length in seconds
+            delete_limit: Emoji deletions allowed per guild per window
+            delete_per: Deletion window length in seconds
+            global_limit: Calls allowed per second across all guilds
+            max_retries: Times a call is retried after a 429 before failing
+        """
+        self.limits = {CREATE: (create_limit, create_per), DELETE: (delete_limit, delete_per)}
+        self.global_bucket = TokenBucket(global_limit, 1)
+        self.max_retries = max_retries
+        self._guilds: Dict[int, _GuildQueue] = {}
+        self._rotation: Deque[int] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        
+        self._completed = {CREATE: 0, DELETE: 0}
+        self._failed = {CREATE: 0, DELETE: 0}
+        self._rate_limited = 0
+    
+    @classmethod
+    def from_config(cls, config) -> "EmojiMutationScheduler":
+        """
+        Create a scheduler from the `rate_limits` section of the config.
+        
+        Args:
+            config: ConfigManager instance
+        """
+        return cls(
+            create_limit=config.get("rate_limits.emoji_create.limit", 30),
+            create_per=config.get("rate_limits.emoji_create.per", 60),
+            delete_limit=config.get("rate_limits.emoji_delete.limit", 30),
+            delete_per=config.get("rate_limits.emoji_delete.per", 60),
+            global_limit=config.get("rate_limits.global_per_second", 40),
+            max_retries=config.get("rate_limits.max_retries", 3)
+        )
+    
+    def _guild_queue(self, guild_id: int) -> _GuildQueue:
+        queue = self._guilds.get(guild_id)
+        if queue is None:
+            buckets = {route: TokenBucket(limit, per) for route, (limit, per) in self.limits.items()}
+            queue = self._guilds[guild_id] = _GuildQueue(buckets)
+        return queue
+    
+    def _submit(self, guild_id: int, route: str, call: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Queue a call for a guild and make sure the dispatcher is running."""
+        loop = asyncio.get_running_loop()
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+        
+        future = loop.create_future()
+        queue = self._guild_queue(guild_id)
+        queue.jobs.append(_Job(route, call, future))
+        if guild_id not in self._rotation:
+            self._rotation.append(guild_id)
+        self._wakeup.set()
+        return future
+    
+    async def create_emoji(self, guild: discord.Guild, name: str, image: bytes, **kwargs) -> discord.Emoji:
+        """
+        Create a custom emoji once the guild's create bucket allows it.
+        
+        Args:
+            guild: Guild to create the emoji in
+            name: Emoji name
+            image: Image bytes
+            **kwargs: Extra arguments for Guild.create_custom_emoji
+        
+        Returns:
+            The created emoji
+        """
+        return await self._submit(
+            guild.id, CREATE, lambda: guild.create_custom_emoji(name=name, image=image, **kwargs)
+        )
+    
+    async def delete_emoji(self, emoji: discord.Emoji, **kwargs):
+        """
+        Delete a custom emoji once its guild's delete bucket allows it.
+        
+        Args:
+            emoji: Emoji to delete
+            **kwargs: Extra arguments for Emoji.delete
+        """
+        return await self._submit(emoji.guild_id, DELETE, lambda: emoji.delete(**kwargs))
+    
+    async def _dispatch(self):
+        """Serve guilds round-robin, starting each guild's next call when its buckets allow."""
+        while True:
+            self._wakeup.clear()
+            next_wait: Optional[float] = None
+            
+            for _ in range(len(self._rotation)):
+                guild_id = self._rotation[0]
+                self._rotation.rotate(-1)
+                queue = self._guilds[guild_id]
+                if queue.busy:
+                    continue
+                # Drop calls whose callers gave up before they spend any tokens
+                while queue.jobs and queue.jobs[0].future.done():
+                    queue.jobs.popleft()
+                if not queue.jobs:
+                    self._rotation.remove(guild_id)
+                    continue
+                
+                job = queue.jobs[0]
+                bucket = queue.buckets[job.route]
+                wait = max(bucket.delay(), self.global_bucket.delay())
+                if wait > 0:
+                    next_wait = wait if next_wait is None else min(next_wait, wait)
+                    continue
+                
+                queue.jobs.popleft()
+                bucket.take()
+                self.global_bucket.take()
+                queue.busy = True
+                task = asyncio.create_task(self._run(guild_id, queue, job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+            
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=next_wait)
+            except asyncio.TimeoutError:
+                pass
+    
+    @staticmethod
+    def _retry_after(error: Exception, bucket: TokenBucket) -> Optional[float]:
+        """Get the retry delay if the error is a rate limit, or None for other errors."""
+        if isinstance(error, discord.RateLimited):
+            return error.retry_after
+        if isinstance(error, discord.HTTPException) and error.status == 429:
+            return getattr(error, "retry_after", None) or 1 / bucket.rate
+        return None
+    
+    async def _run(self, guild_id: int, queue: _GuildQueue, job: _Job):
+        """Make one call and settle its future; 429s pause the bucket and requeue the call."""
+        try:
+            if job.future.cancelled():
+                return
+            job.attempts += 1
+            with EMOJI_CALL_DURATION.time(route=job.route):
+                result = await job.call()
+        except Exception as e:
+            bucket = queue.buckets[job.route]
+            retry_after = self._retry_after(e, bucket)
+            EMOJI_CALLS.inc(route=job.route, outcome="error" if retry_after is None else "rate_limited")
+            if retry_after is not None and job.attempts <= self.max_retries:
+                logger.warning(f"Rate limited on emoji {job.route} in guild {guild_id}, retrying in {retry_after:.1f}s")
+                self._rate_limited += 1
+                bucket.pause(retry_after)
+                queue.jobs.appendleft(job)
+            else:
+                self._failed[job.route] += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+        else:
+            self._completed[job.route] += 1
+            EMOJI_CALLS.inc(route=job.route, outcome="ok")
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            queue.busy = False
+            if queue.jobs and guild_id not in self._rotation:
+                self._rotation.append(guild_id)
+            self._wakeup.set()
+    
+    def pending(self, guild_id: int) -> int:
+        """Number of queued calls for a guild."""
+        queue = self._guilds.get(guild_id)
+        return len(queue.jobs) if queue else 0
+    
+    def estimate_completion(self, guild_id: int, creates: int = 0, deletes: int = 0) -> float:
+        """
+        Estimate the seconds until a guild's queued calls (plus any planned ones) are done.
+        
+        Args:
+            guild_id: Guild ID
+            creates: Additional emoji creations planned but not yet queued
+            deletes: Additional emoji deletions planned but not yet queued
+        
+        Returns:
+            Estimated seconds, based on the guild's current bucket state
+        """
+        queue = self._guild_queue(guild_id)
+        counts = {CREATE: creates, DELETE: deletes}
+        for job in queue.jobs:
+            counts[job.route] += 1
+        return sum(queue.buckets[route].time_for(count) for route, count in counts.items())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        return {
+            "guilds_queued": len(self._rotation),
+            "pending": sum(len(queue.jobs) for queue in self._guilds.values()),
+            "completed": dict(self._completed),
+            "failed": dict(self._failed),
+            "rate_limited": self._rate_limited
+        }
+    
+    async def close(self):
+        """Stop the dispatcher and fail any calls still queued."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for queue in self._guilds.values():
+            while queue.jobs:
+                job = queue.jobs.popleft()
+                if not job.future.done():
+                    job.future.cancel()
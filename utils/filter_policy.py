@@ -0,0 +1,119 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+from utils.keyword_matcher import KeywordMatcher
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Titles made only of these characters are always accepted
+TITLE_PATTERN = re.compile(r'^[a-zA-Z0-9_\-\s]+$')
+SPECIAL_CHAR_PATTERN = re.compile(r'[^a-zA-Z0-9_\-\s]')
+
+@dataclass(frozen=True)
+class FilterPolicy:
+    """
+    Filter settings compiled from the config, so per-emoji checks do no config lookups.
+    
+    A policy is immutable; EmojiFilter builds a new one when the config version changes.
+    """
+    
+    min_favorites: int
+    min_file_size: int
+    max_file_size: int
+    adult_filter_enabled: bool
+    adult_matcher: KeywordMatcher
+    config_version: int = 0
+    
+    @classmethod
+    def from_config(cls, config, adult_matcher: KeywordMatcher) -> "FilterPolicy":
+        """
+        Compile a policy from the `emoji_quality` section of the config.
+        
+        Args:
+            config: ConfigManager instance
+            adult_matcher: Compiled adult keyword matcher
+        """
+        return cls(
+            min_favorites=config.get("emoji_quality.min_favorites", 0),
+            min_file_size=config.get("emoji_quality.min_file_size", 100),
+            max_file_size=config.get("emoji_quality.max_file_size", 256000),
+            adult_filter_enabled=config.get("emoji_quality.adult_filter_enabled", True),
+            adult_matcher=adult_matcher,
+            config_version=config.version
+        )
+    
+    def find_adult_keyword(self, emoji: Dict[str, Any]) -> Optional[str]:
+        """
+        Find the adult keyword contained in an emoji, if any.
+        
+        Title, description and slug are scanned in a single pass through the
+        compiled keyword automaton.
+        
+        Args:
+            emoji: Emoji dictionary from API
+        
+        Returns:
+            The matched keyword, or None if no adult content was detected
+        """
+        if not self.adult_matcher:
+            return None
+        
+        # Fields are joined with a separator no keyword contains, so matches cannot span fields
+        text = "\0".join((
+            emoji.get("title", ""),
+            emoji.get("description", ""),
+            emoji.get("slug", "")
+        )).lower()
+        return self.adult_matcher.find(text)
+    
+    def is_adult(self, emoji: Dict[str, Any]) -> bool:
+        """
+        Check if emoji contains adult content.
+        
+        Args:
+            emoji: Emoji dictionary from API
+        
+        Returns:
+            True if adult content detected
+        """
+        keyword = self.find_adult_keyword(emoji)
+        if keyword is not None:
+            logger.debug(f"Adult content detected in emoji: {emoji.get('title', '')} (keyword: {keyword})")
+            return True
+        return False
+    
+    def is_quality(self, emoji: Dict[str, Any]) -> bool:
+        """
+        Check if emoji meets quality standards.
+        
+        Args:
+            emoji: Emoji dictionary from API
+        
+        Returns:
+            True if emoji meets quality standards
+        """
+        # Check minimum favorites
+        if emoji.get("faves", 0) < self.min_favorites:
+            return False
+        
+        # Check file size (if available)
+        filesize = emoji.get("filesize", 0)
+        if filesize > 0 and (filesize < self.min_file_size or filesize > self.max_file_size):
+            logger.debug(f"Emoji {emoji.get('title')} rejected: filesize {filesize}")
+            return False
+        
+        # Check for valid title (not gibberish)
+        title = emoji.get("title", "")
+        if len(title) < 2 or len(title) > 100:
+            return False
+        
+        # Check if title is mostly alphanumeric or underscores
+        if not TITLE_PATTERN.match(title):
+            # Allow some special characters but reject if too many
+            special_chars = len(SPECIAL_CHAR_PATTERN.findall(title))
+            if special_chars > len(title) * 0.3:  # More than 30% special chars
+                logger.debug(f"Emoji {title} rejected: too many special characters")
+                return False
+        
+        return True
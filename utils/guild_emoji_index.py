@@ -0,0 +1,149 @@
+from typing import Dict, Iterable, List, Optional
+import discord
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class GuildEmojis:
+    """Name and ID lookup over one guild's custom emojis, with static/animated counts."""
+    
+    def __init__(self, emojis: Iterable[discord.Emoji] = ()):
+        """
+        Build the index.
+        
+        Args:
+            emojis: The guild's emojis, in guild order
+        """
+        self.by_id: Dict[int, discord.Emoji] = {}
+        # Lowercase name -> emojis with that name (Discord allows duplicates), in guild order
+        self.by_name: Dict[str, List[discord.Emoji]] = {}
+        self.animated_count = 0
+        self.static_count = 0
+        for emoji in emojis:
+            self.add(emoji)
+    
+    def add(self, emoji: discord.Emoji):
+        """Add an emoji, replacing the indexed version with the same ID."""
+        if emoji.id in self.by_id:
+            self.remove(emoji.id)
+        self.by_id[emoji.id] = emoji
+        self.by_name.setdefault(emoji.name.lower(), []).append(emoji)
+        if emoji.animated:
+            self.animated_count += 1
+        else:
+            self.static_count += 1
+    
+    def remove(self, emoji_id: int):
+        """Remove an emoji by ID, if it is indexed."""
+        emoji = self.by_id.pop(emoji_id, None)
+        if emoji is None:
+            return
+        key = emoji.name.lower()
+        named = [other for other in self.by_name[key] if other.id != emoji_id]
+        if named:
+            self.by_name[key] = named
+        else:
+            del self.by_name[key]
+        if emoji.animated:
+            self.animated_count -= 1
+        else:
+            self.static_count -= 1
+    
+    def update(self, emojis: Iterable[discord.Emoji]):
+        """
+        Bring the index in line with the guild's current emojis.
+        
+        Only added, removed and renamed emojis are touched.
+        
+        Args:
+            emojis: The guild's emojis after the change
+        """
+        current = set()
+        for emoji in emojis:
+            current.add(emoji.id)
+            indexed = self.by_id.get(emoji.id)
+            if indexed is None or indexed.name != emoji.name or indexed.animated != emoji.animated:
+                self.add(emoji)
+            else:
+                # Keep the newest object so str() and roles stay current
+                self.by_id[emoji.id] = emoji
+                named = self.by_name[emoji.name.lower()]
+                named[:] = [emoji if other.id == emoji.id else other for other in named]
+        for emoji_id in [emoji_id for emoji_id in self.by_id if emoji_id not in current]:
+            self.remove(emoji_id)
+    
+    def find(self, identifier: str) -> Optional[discord.Emoji]:
+        """
+        Find an emoji by ID or by case-insensitive name.
+        
+        Args:
+            identifier: Emoji ID or name
+        
+        Returns:
+            The emoji, or None if there is no match
+        """
+        if identifier.isdigit():
+            emoji = self.by_id.get(int(identifier))
+            if emoji is not None:
+                return emoji
+        named = self.by_name.get(identifier.lower())
+        return named[0] if named else None
+    
+    def has_name(self, name: str) -> bool:
+        """Check if an emoji with exactly this name exists."""
+        return any(emoji.name == name for emoji in self.by_name.get(name.lower(), ()))
+    
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+class GuildEmojiIndex:
+    """
+    Per-guild emoji indexes, kept current from gateway events.
+    
+    Guilds are indexed on first use or when the bot joins them, updated from
+    on_guild_emojis_update and dropped when the bot leaves, so commands never
+    scan guild.emojis.
+    """
+    
+    def __init__(self):
+        self._guilds: Dict[int, GuildEmojis] = {}
+    
+    def get(self, guild: discord.Guild) -> GuildEmojis:
+        """
+        Get a guild's index, building it from the guild's emojis if needed.
+        
+        Args:
+            guild: Discord guild
+        """
+        index = self._guilds.get(guild.id)
+        if index is None:
+            index = self._guilds[guild.id] = GuildEmojis(guild.emojis)
+        return index
+    
+    def on_emojis_update(self, guild: discord.Guild, emojis: Iterable[discord.Emoji]):
+        """Apply an emoji update event."""
+        index = self._guilds.get(guild.id)
+        if index is None:
+            self._guilds[guild.id] = GuildEmojis(emojis)
+        else:
+            index.update(emojis)
+    
+    def on_guild_join(self, guild: discord.Guild):
+        """Index a guild the bot joined."""
+        self._guilds[guild.id] = GuildEmojis(guild.emojis)
+    
+    def on_guild_remove(self, guild: discord.Guild):
+        """Forget a guild the bot left."""
+        self._guilds.pop(guild.id, None)
+    
+    def rebuild(self, guilds: Iterable[discord.Guild]):
+        """Re-index all guilds (after a reconnect, events may have been missed)."""
+        self._guilds = {guild.id: GuildEmojis(guild.emojis) for guild in guilds}
+        logger.info(f"Indexed emojis of {len(self._guilds)} guilds")
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get index statistics."""
+        return {
+            "guilds": len(self._guilds),
+            "emojis": sum(len(index) for index in self._guilds.values())
+        }
@@ -0,0 +1,247 @@
+import asyncio
+import time
+import aiohttp
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+
+logger = setup_logger(__name__)
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "bot_http_requests_total", "Outbound HTTP requests by status class (2xx, 4xx, ...) or transport error", ["result"]
+)
+HTTP_DURATION = REGISTRY.histogram("bot_http_request_duration_seconds", "Outbound HTTP request durations")
+HTTP_BYTES = REGISTRY.counter("bot_http_received_bytes_total", "Bytes received over HTTP", ["kind"])
+DOWNLOADS = REGISTRY.counter("bot_http_downloads_total", "Image downloads by outcome", ["result"])
+
+# Discord's maximum file size for custom emojis
+MAX_EMOJI_SIZE = 256000
+
+class DownloadError(Exception):
+    """Raised when an image download fails."""
+
+class DownloadStatusError(DownloadError):
+    """Raised when the server answers a download with a non-200 status."""
+    
+    def __init__(self, url: str, status: int):
+        super().__init__(f"Download of {url} failed with status {status}")
+        self.url = url
+        self.status = status
+
+class DownloadTooLargeError(DownloadError):
+    """Raised when a download exceeds the allowed size."""
+    
+    def __init__(self, url: str, max_size: int):
+        super().__init__(f"Download of {url} exceeds {max_size} bytes")
+        self.url = url
+        self.max_size = max_size
+
+class HttpClient:
+    """Bot-wide HTTP client sharing one pooled aiohttp session for all outbound requests."""
+    
+    def __init__(
+        self,
+        pool_size: int = 100,
+        pool_size_per_host: int = 20,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30,
+        timeout: float = 30,
+        connect_timeout: float = 10
+    ):
+        """
+        Initialize the HTTP client (the session is created lazily inside the event loop).
+        
+        Args:
+            pool_size: Maximum number of simultaneous connections
+            pool_size_per_host: Maximum number of simultaneous connections per host
+            dns_cache_ttl: Seconds to cache DNS lookups
+            keepalive_timeout: Seconds to keep idle connections open for reuse
+            timeout: Total timeout for a request in seconds
+            connect_timeout: Timeout for establishing a connection in seconds
+        """
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._requests = 0
+        self._errors = 0
+        self._error_responses = 0
+        self._bytes_received = 0
+        self._request_seconds = 0.0
+    
+    @classmethod
+    def from_config(cls, config) -> "HttpClient":
+        """
+        Create an HTTP client from the `http` section of the config.
+        
+        Args:
+            config: ConfigManager instance
+        """
+        return cls(
+            pool_size=config.get("http.pool_size", 100),
+            pool_size_per_host=config.get("http.pool_size_per_host", 20),
+            dns_cache_ttl=config.get("http.dns_cache_ttl", 300),
+            keepalive_timeout=config.get("http.keepalive_timeout", 30),
+            timeout=config.get("http.timeout", 30),
+            connect_timeout=config.get("http.connect_timeout", 10)
+        )
+    
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session, created on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            logger.info(
+                f"Created HTTP session (pool: {self.pool_size}, per host: {self.pool_size_per_host})"
+            )
+        return self._session
+    
+    async def start(self):
+        """Create the shared session."""
+        _ = self.session
+    
+    async def close(self):
+        """Close the shared session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Closed HTTP session")
+        self._session = None
+    
+    @asynccontextmanager
+    async def get(self, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Perform a GET request through the shared session.
+        
+        Only connection failures and timeouts count as errors; responses are
+        counted by status class, and exceptions raised by the caller while
+        handling the response do not count as failures of the request.
+        
+        Args:
+            url: URL to fetch
+            **kwargs: Extra arguments for aiohttp's ClientSession.get
+        
+        Yields:
+            The response
+        """
+        self._requests += 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        start = time.perf_counter()
+        status = None
+        try:
+            async with self.session.get(url, **kwargs) as response:
+                status = response.status
+                yield response
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            status = None
+            self._errors += 1
+            HTTP_REQUESTS.inc(result="error")
+            raise
+        finally:
+            self._in_flight -= 1
+            elapsed = time.perf_counter() - start
+            self._request_seconds += elapsed
+            HTTP_DURATION.observe(elapsed)
+            if status is not None:
+                HTTP_REQUESTS.inc(result=f"{status // 100}xx")
+                if status >= 400:
+                    self._error_responses += 1
+    
+    async def get_json(self, url: str) -> Tuple[int, Any]:
+        """
+        Fetch and decode a JSON document.
+        
+        Args:
+            url: URL to fetch
+        
+        Returns:
+            Tuple of (status code, decoded body or None if the status is not 200)
+        """
+        async with self.get(url) as response:
+            if response.status != 200:
+                return response.status, None
+            body = await response.read()
+            self._bytes_received += len(body)
+            HTTP_BYTES.inc(len(body), kind="json")
+            return response.status, await response.json()
+    
+    async def download_image(
+        self,
+        url: str,
+        max_size: int = MAX_EMOJI_SIZE,
+        chunk_size: int = 16384
+    ) -> bytes:
+        """
+        Download an image, streaming the body and aborting as soon as it exceeds max_size.
+        
+        Args:
+            url: Image URL
+            max_size: Maximum body size in bytes (default: Discord's emoji limit)
+            chunk_size: Size of the chunks read from the connection
+            
+        Returns:
+            The image bytes
+            
+        Raises:
+            DownloadStatusError: If the server does not answer with status 200
+            DownloadTooLargeError: If the body is larger than max_size
+            DownloadError: On network errors and timeouts
+        """
+        # Rejections are decided inside the request and raised after it, so they
+        # are counted as downloads that failed, not as HTTP errors
+        status = None
+        too_large = False
+        body = bytearray()
+        try:
+            async with self.get(url) as response:
+                if response.status != 200:
+                    status = response.status
+                elif response.content_length is not None and response.content_length > max_size:
+                    too_large = True
+                else:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        body.extend(chunk)
+                        self._bytes_received += len(chunk)
+                        HTTP_BYTES.inc(len(chunk), kind="image")
+                        if len(body) > max_size:
+                            too_large = True
+                            break
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            DOWNLOADS.inc(result="error")
+            raise DownloadError(f"Download of {url} failed: {e}") from e
+        
+        if status is not None:
+            DOWNLOADS.inc(result="status")
+            raise DownloadStatusError(url, status)
+        if too_large:
+            DOWNLOADS.inc(result="too_large")
+            raise DownloadTooLargeError(url, max_size)
+        DOWNLOADS.inc(result="ok")
+        return bytes(body)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool and request statistics."""
+        return {
+            "session_open": self._session is not None and not self._session.closed,
+            "pool_size": self.pool_size,
+            "pool_size_per_host": self.pool_size_per_host,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "requests": self._requests,
+            "errors": self._errors,
+            "error_responses": self._error_responses,
+            "bytes_received": self._bytes_received,
+            "avg_request_seconds": self._request_seconds / self._requests if self._requests else 0
+        }
@@ -0,0 +1,79 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds any of a set of keywords in a single pass over the text."""
+    
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Compile the keywords into an automaton.
+        
+        Args:
+            keywords: Keywords to match (matching is case-sensitive, so pass them lowercased)
+        """
+        self.keywords: List[str] = list(dict.fromkeys(k for k in keywords if k))
+        self._transitions: List[Dict[str, int]] = [{}]
+        self._outputs: List[Optional[str]] = [None]
+        self._build()
+    
+    def _build(self):
+        """Build the keyword trie, then turn it into a DFA by folding in the failure links."""
+        transitions = self._transitions
+        outputs = self._outputs
+        
+        # Trie of all keywords
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                next_state = transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(transitions)
+                    transitions.append({})
+                    outputs.append(None)
+                    transitions[state][char] = next_state
+                state = next_state
+            if outputs[state] is None:
+                outputs[state] = keyword
+        
+        # Breadth-first pass computing failure links; each state inherits the
+        # transitions and output of its failure state, so matching never backtracks
+        failure = [0] * len(transitions)
+        queue = deque()
+        for next_state in transitions[0].values():
+            queue.append(next_state)
+        
+        while queue:
+            state = queue.popleft()
+            fallback = transitions[failure[state]]
+            for char, next_state in list(transitions[state].items()):
+                queue.append(next_state)
+                failure[next_state] = fallback.get(char, 0)
+            if outputs[state] is None:
+                outputs[state] = outputs[failure[state]]
+            for char, next_state in fallback.items():
+                transitions[state].setdefault(char, next_state)
+    
+    def find(self, text: str) -> Optional[str]:
+        """
+        Find the first keyword occurring in the text.
+        
+        Args:
+            text: Text to scan
+        
+        Returns:
+            The keyword ending earliest in the text, or None if there is no match
+        """
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        for char in text:
+            state = transitions[state].get(char, 0)
+            if outputs[state] is not None:
+                return outputs[state]
+        return None
+    
+    def __bool__(self) -> bool:
+        return bool(self.keywords)
+    
+    def __len__(self) -> int:
+        return len(self.keywords)
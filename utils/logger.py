@@ -1,53 +1,192 @@
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
-def setup_logger(name: str = "emoji_bot", level: int = logging.INFO) -> logging.Logger:
+# Records are queued here and written to the file and console by a background thread
+_queue: Optional[queue.Queue] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+# Levels from the `logging` config section: default level and per-logger overrides
+_default_level = logging.INFO
+_levels: Dict[str, int] = {}
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records (and counts them) instead of blocking when the queue is full."""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.queued = 0
+        self.dropped = 0
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.queued += 1
+        except queue.Full:
+            self.dropped += 1
+
+class SamplingFilter(logging.Filter):
     """
-    Set up a logger with both file and console handlers.
+    Rate-limits records tagged with a sample key.
+    
+    Code on hot paths logs with `extra={"sample_key": "..."}`; at most `burst`
+    records per key pass in each `interval` seconds. The next record that
+    passes reports how many were suppressed in between. Untagged records and
+    warnings or worse always pass.
+    """
+    
+    def __init__(self, interval: float = 10.0, burst: int = 1):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.sampled = 0
+        # sample key -> (window start, records passed in window, records suppressed)
+        self._windows: Dict[str, Tuple[float, int, int]] = {}
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None or record.levelno >= logging.WARNING:
+            return True
+        
+        now = time.monotonic()
+        start, passed, suppressed = self._windows.get(key, (now, 0, 0))
+        if now - start >= self.interval:
+            start, passed = now, 0
+        if passed >= self.burst:
+            self._windows[key] = (start, passed, suppressed + 1)
+            self.sampled += 1
+            return False
+        
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        self._windows[key] = (start, passed + 1, 0)
+        return True
+
+_sampling_filter = SamplingFilter()
+
+def _ensure_listener():
+    """Create the queue and start the background listener on first use."""
+    global _queue, _queue_handler, _listener
+    with _lock:
+        if _queue_handler is not None:
+            return
+        
+        # Create logs directory if it doesn't exist
+        log_dir = Path("logs")
+        log_dir.mkdir(exist_ok=True)
+        
+        # File handler with rotation
+        file_handler = RotatingFileHandler(
+            log_dir / "emoji_bot.log",
+            maxBytes=5 * 1024 * 1024,  # 5MB
+            backupCount=3
+        )
+        file_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        file_handler.setFormatter(file_formatter)
+        
+        # Console handler
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_formatter = logging.Formatter(
+            '%(levelname)s - %(message)s'
+        )
+        console_handler.setFormatter(console_formatter)
+        
+        _queue = queue.Queue(maxsize=10000)
+        _queue_handler = DroppingQueueHandler(_queue)
+        _queue_handler.addFilter(_sampling_filter)
+        _listener = QueueListener(_queue, file_handler, console_handler)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+def _level_for(name: str) -> int:
+    """Get the configured level of a logger (the most specific dotted prefix wins)."""
+    parts = name.split(".")
+    for i in range(len(parts), 0, -1):
+        level = _levels.get(".".join(parts[:i]))
+        if level is not None:
+            return level
+    return _default_level
+
+def _parse_level(level: Any) -> int:
+    """Convert a level name ("DEBUG") or number to a level number (INFO if unknown)."""
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    return value if isinstance(value, int) else logging.INFO
+
+def setup_logger(name: str = "emoji_bot", level: Optional[int] = None) -> logging.Logger:
+    """
+    Set up a logger that writes to the shared log queue.
+    
+    Records are handed to a background thread that writes the log file and
+    the console, so logging never blocks the event loop on I/O.
     
     Args:
         name: Logger name
-        level: Logging level
-        
+        level: Logging level (defaults to the level configured for this logger)
+    
     Returns:
         Configured logger instance
     """
     logger = logging.getLogger(name)
-    logger.setLevel(level)
+    logger.setLevel(level if level is not None else _level_for(name))
     
     # Avoid duplicate handlers
     if logger.handlers:
         return logger
     
-    # Create logs directory if it doesn't exist
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    # File handler with rotation
-    file_handler = RotatingFileHandler(
-        log_dir / "emoji_bot.log",
-        maxBytes=5 * 1024 * 1024,  # 5MB
-        backupCount=3
-    )
-    file_handler.setLevel(level)
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(file_formatter)
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_formatter = logging.Formatter(
-        '%(levelname)s - %(message)s'
-    )
-    console_handler.setFormatter(console_formatter)
-    
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    _ensure_listener()
+    logger.addHandler(_queue_handler)
     
     return logger
+
+def configure_logging(config):
+    """
+    Apply the `logging` section of the config.
+    
+    Sets the default level and per-logger levels (for loggers already set up
+    and ones created later) and the sampling of hot-path messages.
+    
+    Args:
+        config: ConfigManager instance
+    """
+    global _default_level, _levels
+    _default_level = _parse_level(config.get("logging.level", "INFO"))
+    _levels = {name: _parse_level(level) for name, level in config.get("logging.levels", {}).items()}
+    _sampling_filter.interval = config.get("logging.sample_interval", 10.0)
+    _sampling_filter.burst = config.get("logging.sample_burst", 1)
+    
+    _ensure_listener()
+    _queue.maxsize = config.get("logging.queue_size", 10000)
+    for name, logger in logging.Logger.manager.loggerDict.items():
+        if isinstance(logger, logging.Logger) and _queue_handler in logger.handlers:
+            logger.setLevel(_level_for(name))
+
+def get_log_stats() -> Dict[str, int]:
+    """Get logging statistics (records queued, dropped on a full queue and suppressed by sampling)."""
+    return {
+        "queued": _queue_handler.queued if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+        "sampled": _sampling_filter.sampled,
+        "backlog": _queue.qsize() if _queue else 0
+    }
+
+def shutdown_logging():
+    """Write out queued records and stop the background listener."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,356 @@
+import asyncio
+import bisect
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+from aiohttp import web
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Latency buckets in seconds, from a fast cache hit to a slow bulk command
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class _Metric:
+    """Base class for metrics: a name, help text and values per label combination."""
+    
+    type = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+    
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def _label_text(self, key: LabelValues, extra: Iterable[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+    
+    def samples(self) -> List[str]:
+        """Get the metric's sample lines in Prometheus text format."""
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+    
+    type = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def inc(self, amount: float = 1, **labels: str):
+        """Increase the count of a label combination."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels: str) -> float:
+        """Get the count of a label combination."""
+        return self._values.get(self._key(labels), 0)
+    
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._label_text(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+class Gauge(_Metric):
+    """A value that can go up and down, either set directly or read from a function at export time."""
+    
+    type = "gauge"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+        self._values: Dict[LabelValues, float] = {}
+    
+    def set(self, value: float, **labels: str):
+        """Set the value of a label combination."""
+        self._values[self._key(labels)] = value
+    
+    def samples(self) -> List[str]:
+        if self.function is not None:
+            try:
+                return [f"{self.name} {_format_value(self.function())}"]
+            except Exception as e:
+                logger.warning(f"Error reading gauge {self.name}: {e}")
+                return []
+        return [f"{self.name}{self._label_text(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+class _HistogramSeries:
+    """Bucket counts of one label combination, plus a window of recent observations for percentiles."""
+    
+    def __init__(self, bucket_count: int, window: int):
+        self.counts = [0] * bucket_count
+        self.count = 0
+        self.sum = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+class Histogram(_Metric):
+    """
+    A distribution of observations (usually durations in seconds).
+    
+    Bucket counts are exported for Prometheus; the most recent observations
+    are also kept so /stats can report exact percentiles.
+    """
+    
+    type = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        window: int = 1024
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.window = window
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+    
+    def observe(self, value: float, **labels: str):
+        """Record an observation for a label combination."""
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _HistogramSeries(len(self.buckets), self.window)
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series.counts[index] += 1
+        series.count += 1
+        series.sum += value
+        series.recent.append(value)
+    
+    def time(self, **labels: str) -> "_Timer":
+        """Time a block: `with histogram.time(route="create"): ...`."""
+        return _Timer(self, labels)
+    
+    def label_sets(self) -> List[Dict[str, str]]:
+        """Get the label combinations observed so far."""
+        return [dict(zip(self.labelnames, key)) for key in self._series]
+    
+    def count(self, **labels: str) -> int:
+        """Get the number of observations of a label combination."""
+        series = self._series.get(self._key(labels))
+        return series.count if series else 0
+    
+    def percentiles(self, quantiles: Sequence[float] = (0.5, 0.95, 0.99), **labels: str) -> Optional[List[float]]:
+        """
+        Get percentiles of the recent observations of a label combination.
+        
+        Args:
+            quantiles: Quantiles between 0 and 1
+            **labels: Label values
+        
+        Returns:
+            One value per quantile, or None if nothing was observed
+        """
+        series = self._series.get(self._key(labels))
+        if series is None or not series.recent:
+            return None
+        ordered = sorted(series.recent)
+        return [ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in quantiles]
+    
+    def samples(self) -> List[str]:
+        lines = []
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series.counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._label_text(key, [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._label_text(key, [('le', '+Inf')])} {series.count}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {series.count}")
+        return lines
+
+class _Timer:
+    """Context manager observing the time spent in a block."""
+    
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+class MetricsRegistry:
+    """Named metrics of the bot, rendered together in Prometheus text format."""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric {metric.name} is already registered with another type or labels")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None
+    ) -> Gauge:
+        """Get or create a gauge (function, if given, is read at export time)."""
+        gauge = self._register(Gauge(name, documentation, labelnames))
+        if function is not None:
+            gauge.function = function
+        return gauge
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        """Get a registered metric by name."""
+        return self._metrics.get(name)
+    
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+# The bot's metrics; modules register theirs at import time
+REGISTRY = MetricsRegistry()
+
+LOOP_LAG = REGISTRY.histogram(
+    "bot_event_loop_lag_seconds",
+    "Delay between when the loop lag probe was due and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+
+class LoopLagMonitor:
+    """Measures event loop lag by checking how late a periodic sleep wakes up."""
+    
+    def __init__(self, interval: float = 0.5, histogram: Histogram = LOOP_LAG):
+        """
+        Initialize the monitor.
+        
+        Args:
+            interval: Seconds between probes
+            histogram: Histogram receiving the lag of each probe
+        """
+        self.interval = interval
+        self.histogram = histogram
+        self._task: Optional[asyncio.Task] = None
+    
+    async def _probe(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.histogram.observe(max(0.0, time.perf_counter() - start - self.interval))
+    
+    def start(self):
+        """Start probing (inside the event loop)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._probe())
+    
+    async def close(self):
+        """Stop probing."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+class MetricsExporter:
+    """Serves a registry at /metrics in Prometheus text format over a local HTTP port."""
+    
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1", port: Optional[int] = None):
+        """
+        Initialize the exporter.
+        
+        Args:
+            registry: Metrics to serve
+            host: Interface to listen on
+            port: Port to listen on (None disables the exporter)
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+    
+    @classmethod
+    def from_config(cls, config, registry: MetricsRegistry = REGISTRY) -> "MetricsExporter":
+        """
+        Create an exporter from the `metrics` section of the config.
+        
+        Args:
+            config: ConfigManager instance
+            registry: Metrics to serve
+        """
+        return cls(
+            registry,
+            host=config.get("metrics.host", "127.0.0.1"),
+            port=config.get("metrics.port")
+        )
+    
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=self.registry.render(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+        )
+    
+    async def start(self):
+        """Start serving, if a port is configured."""
+        if self.port is None or self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+    
+    async def close(self):
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,66 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+async def prefetch(
+    items: Iterable[T],
+    fetch: Callable[[T], Awaitable[R]],
+    concurrency: int = 4,
+    buffer_size: int = 8
+) -> AsyncIterator[Tuple[T, Optional[R], Optional[Exception]]]:
+    """
+    Run fetch over items concurrently, yielding results in input order.
+    
+    A producer task keeps a bounded queue of started fetches filled while the
+    consumer works through the results, so fetching overlaps with whatever the
+    consumer does with each result. Items are pulled from the iterable lazily,
+    only when there is room in the queue. Close the generator (aclose) when
+    stopping early so pending fetches are cancelled.
+    
+    Args:
+        items: Items to fetch
+        fetch: Coroutine function fetching one item
+        concurrency: Maximum number of fetches running at once
+        buffer_size: Maximum number of fetched or in-flight items waiting for the consumer
+    
+    Yields:
+        Tuples of (item, result, error); error is set and result is None if the fetch raised
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+    
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await fetch(item)
+    
+    async def produce():
+        for item in items:
+            task = asyncio.create_task(run(item))
+            try:
+                await queue.put((item, task))
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+        await queue.put(None)
+    
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            entry = await queue.get()
+            if entry is None:
+                break
+            item, task = entry
+            try:
+                result = await task
+            except Exception as e:
+                yield item, None, e
+            else:
+                yield item, result, None
+    finally:
+        producer.cancel()
+        while not queue.empty():
+            entry = queue.get_nowait()
+            if entry is not None:
+                entry[1].cancel()
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+
+logger = setup_logger(__name__)
+
+CACHE_LOOKUPS = REGISTRY.counter("bot_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+
+class QueryCache:
+    """
+    LRU cache of command results, tagged with the data version they were computed from.
+    
+    Callers pass the current version (catalog version and config version) on
+    every lookup; when it changes, all entries are dropped at once, so results
+    never outlive a catalog refresh or a config reload.
+    """
+    
+    def __init__(self, max_entries: int = 256, max_items: int = 200000):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of cached results
+            max_items: Maximum total size of the cached results (in emojis referenced)
+        """
+        self.max_entries = max_entries
+        self.max_items = max_items
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._items = 0
+        self._version: Optional[Hashable] = None
+        
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+    
+    @classmethod
+    def from_config(cls, config) -> "QueryCache":
+        """
+        Create a query cache from the `query_cache` section of the config.
+        
+        Args:
+            config: ConfigManager instance
+        """
+        return cls(
+            max_entries=config.get("query_cache.max_entries", 256),
+            max_items=config.get("query_cache.max_items", 200000)
+        )
+    
+    def _check_version(self, version: Hashable):
+        if version != self._version:
+            if self._entries:
+                self._invalidations += 1
+                logger.debug(f"Query cache invalidated ({len(self._entries)} entries)")
+            self.clear()
+            self._version = version
+    
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """
+        Look up a cached result.
+        
+        Args:
+            key: Normalized query parameters
+            version: Current data version
+        
+        Returns:
+            The cached result, or None on a miss
+        """
+        self._check_version(version)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            CACHE_LOOKUPS.inc(cache="query", result="miss")
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        CACHE_LOOKUPS.inc(cache="query", result="hit")
+        return entry[0]
+    
+    def put(self, key: Hashable, version: Hashable, value: Any, size: int = 1):
+        """
+        Store a result, evicting least recently used results beyond the limits.
+        
+        Args:
+            key: Normalized query parameters
+            version: Data version the result was computed from
+            value: The result (must not be mutated afterwards)
+            size: Weight of the result against max_items (results larger than max_items are not cached)
+        """
+        self._check_version(version)
+        if size > self.max_items:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._items -= previous[1]
+        self._entries[key] = (value, size)
+        self._items += size
+        
+        while len(self._entries) > self.max_entries or self._items > self.max_items:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._items -= evicted_size
+            self._evictions += 1
+    
+    def clear(self):
+        """Drop all cached results."""
+        self._entries.clear()
+        self._items = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "items": self._items,
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations
+        }
@@ -0,0 +1,114 @@
+from array import array
+from typing import Dict, List, Any, Optional
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Length of the n-grams stored in the index
+NGRAM_SIZE = 3
+
+class SearchIndex:
+    """Trigram index over emoji titles, slugs and descriptions for fast substring search."""
+    
+    def __init__(self, emojis: Optional[List[Dict[str, Any]]] = None):
+        """
+        Initialize the search index.
+        
+        Args:
+            emojis: Emoji list to index (the index is empty if omitted)
+        """
+        self.emojis: List[Dict[str, Any]] = []
+        self._haystacks: List[str] = []
+        self._postings: Dict[str, array] = {}
+        if emojis:
+            self.build(emojis)
+    
+    @staticmethod
+    def _haystack(emoji: Dict[str, Any]) -> str:
+        """Build the lowercased searchable text for an emoji."""
+        # Fields are joined with a separator that never appears in a query,
+        # so a match cannot span two fields
+        return "\n".join((
+            (emoji.get("title") or "").lower(),
+            (emoji.get("slug") or "").lower(),
+            (emoji.get("description") or "").lower()
+        ))
+    
+    def build(self, emojis: List[Dict[str, Any]]):
+        """
+        Rebuild the index from an emoji list.
+        
+        Args:
+            emojis: List of emoji dictionaries
+        """
+        haystacks = [self._haystack(emoji) for emoji in emojis]
+        postings: Dict[str, array] = {}
+        
+        for position, text in enumerate(haystacks):
+            grams = {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+            for gram in grams:
+                if "\n" in gram:
+                    continue
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(position)
+        
+        self.emojis = emojis
+        self._haystacks = haystacks
+        self._postings = postings
+        logger.info(f"Indexed {len(emojis)} emojis ({len(postings)} trigrams)")
+    
+    def candidates(self, query: str) -> Optional[List[int]]:
+        """
+        Get positions of emojis whose text contains every trigram of the query.
+        
+        Args:
+            query: Search query
+        
+        Returns:
+            Sorted list of candidate positions, or None if the query is too
+            short to be narrowed down by the index
+        """
+        query = query.lower()
+        if len(query) < NGRAM_SIZE:
+            return None
+        
+        grams = {query[i:i + NGRAM_SIZE] for i in range(len(query) - NGRAM_SIZE + 1)}
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        
+        # Intersect starting from the rarest trigram to keep the working set small
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result.intersection_update(posting)
+            if not result:
+                return []
+        return sorted(result)
+    
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Find all indexed emojis whose title, slug or description contains the query.
+        
+        Args:
+            query: Search query (case-insensitive substring)
+        
+        Returns:
+            Matching emojis in catalog order
+        """
+        query_lower = query.lower()
+        positions = self.candidates(query_lower)
+        if positions is None:
+            positions = range(len(self._haystacks))
+        
+        haystacks = self._haystacks
+        emojis = self.emojis
+        return [emojis[i] for i in positions if query_lower in haystacks[i]]
+    
+    def __len__(self) -> int:
+        return len(self.emojis)
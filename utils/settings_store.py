@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class SettingsStore:
+    """
+    Per-server settings in SQLite, served from memory with write-behind batching.
+    
+    Reads never touch the database. Writes update memory immediately and are
+    queued per (server, key); a background flush writes everything queued in
+    a single transaction, so a crash can lose at most the last flush interval
+    but never corrupts other servers' settings.
+    """
+    
+    def __init__(
+        self,
+        path: str = "settings.db",
+        legacy_path: Optional[str] = "settings.json",
+        flush_delay: float = 1.0
+    ):
+        """
+        Open the store, creating the database and migrating settings.json if needed.
+        
+        Args:
+            path: SQLite database file
+            legacy_path: JSON settings file to import on first run (renamed afterwards)
+            flush_delay: Seconds to wait after a write before flushing, so bursts share one transaction
+        """
+        self.path = Path(path)
+        self.flush_delay = flush_delay
+        self._settings: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # One thread owns the connection, so database work is serialized and off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="settings-db")
+        
+        self._writes = 0
+        self._flushes = 0
+        
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS settings ("
+            "server_id TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (server_id, key))"
+        )
+        self._conn.commit()
+        
+        if legacy_path:
+            self._migrate(Path(legacy_path))
+        for server_id, key, value in self._conn.execute("SELECT server_id, key, value FROM settings"):
+            self._settings.setdefault(server_id, {})[key] = json.loads(value)
+        logger.info(f"Loaded settings for {len(self._settings)} servers from {self.path}")
+    
+    def _migrate(self, legacy_path: Path):
+        """Import a legacy settings.json into an empty database, then rename the file."""
+        if not legacy_path.exists():
+            return
+        if self._conn.execute("SELECT 1 FROM settings LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy_path, 'r') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading {legacy_path} for migration: {e}")
+            return
+        
+        rows = [
+            (str(server_id), key, json.dumps(value))
+            for server_id, server_settings in legacy.items()
+            for key, value in server_settings.items()
+        ]
+        with self._conn:
+            self._conn.executemany("INSERT INTO settings VALUES (?, ?, ?)", rows)
+        os.replace(legacy_path, legacy_path.with_name(legacy_path.name + ".migrated"))
+        logger.info(f"Migrated {len(rows)} settings for {len(legacy)} servers from {legacy_path}")
+    
+    def get(self, server_id: int, key: str, default: Any = None) -> Any:
+        """Get a per-server setting."""
+        return self._settings.get(str(server_id), {}).get(key, default)
+    
+    def get_all(self, server_id: int) -> Dict[str, Any]:
+        """Get a copy of all settings of a server."""
+        return dict(self._settings.get(str(server_id), {}))
+    
+    def set(self, server_id: int, key: str, value: Any):
+        """
+        Set a per-server setting; it is readable at once and written to disk shortly after.
+        
+        Args:
+            server_id: Server ID
+            key: Setting name
+            value: JSON-serializable value
+        """
+        server_id = str(server_id)
+        self._settings.setdefault(server_id, {})[key] = value
+        self._pending[(server_id, key)] = value
+        self._writes += 1
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, shutdown): write through
+            self._write(self._take_pending())
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later())
+    
+    def _take_pending(self) -> Dict[Tuple[str, str], Any]:
+        pending, self._pending = self._pending, {}
+        return pending
+    
+    def _write(self, pending: Dict[Tuple[str, str], Any]):
+        """Write queued settings in one transaction."""
+        if not pending:
+            return
+        rows = [(server_id, key, json.dumps(value)) for (server_id, key), value in pending.items()]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO settings VALUES (?, ?, ?) "
+                "ON CONFLICT (server_id, key) DO UPDATE SET value = excluded.value",
+                rows
+            )
+        self._flushes += 1
+    
+    async def _flush_later(self):
+        """Flush after the delay, and again for writes queued during a flush or left by a failed one."""
+        while self._pending:
+            await asyncio.sleep(self.flush_delay)
+            await self.flush()
+    
+    async def flush(self):
+        """Write all queued settings now."""
+        pending = self._take_pending()
+        if not pending:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._write, pending)
+        except Exception as e:
+            logger.error(f"Error saving settings: {e}")
+            # Keep the failed writes queued unless newer values replaced them
+            for item, value in pending.items():
+                self._pending.setdefault(item, value)
+    
+    async def close(self):
+        """Flush queued settings and close the database."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._conn.close)
+        self._executor.shutdown(wait=False)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        return {
+            "servers": len(self._settings),
+            "pending": len(self._pending),
+            "writes": self._writes,
+            "flushes": self._flushes
+        }
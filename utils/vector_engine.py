@@ -0,0 +1,124 @@
+from typing import Any, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the catalog falls back to pure Python
+    np = None
+
+def available() -> bool:
+    """Check whether NumPy is installed."""
+    return np is not None
+
+class VectorEngine:
+    """
+    NumPy views of an EmojiCatalog's columns for vectorized filtering and sorting.
+    
+    Filters become boolean masks and sorts become stable argsorts, so results
+    (including the order of ties) are identical to the pure-Python path.
+    """
+    
+    def __init__(self, catalog):
+        """
+        Wrap a catalog's columns (the numeric columns are shared, not copied).
+        
+        Args:
+            catalog: EmojiCatalog to mirror
+        """
+        self.emojis = catalog.emojis
+        self.faves = np.frombuffer(catalog.faves, dtype=np.intc)
+        self.category = np.frombuffer(catalog.category, dtype=np.intc)
+        self.animated = np.frombuffer(catalog.animated, dtype=np.bool_)
+        self.quality = np.frombuffer(catalog.quality, dtype=np.bool_)
+        self.safe = np.frombuffer(catalog.safe, dtype=np.bool_)
+        try:
+            self.ids: Optional[Any] = np.fromiter(
+                (emoji.get("id", 0) for emoji in self.emojis), dtype=np.int64, count=len(self.emojis)
+            )
+        except (TypeError, ValueError, OverflowError):
+            # Non-numeric IDs: "recent" sorts use the pure-Python path
+            self.ids = None
+        self._title_rank: Optional[Any] = None
+    
+    def _title_ranks(self):
+        """Rank of each emoji's lowercased title (equal titles share a rank), computed on first use."""
+        if self._title_rank is None:
+            titles = [emoji.get("title", "").lower() for emoji in self.emojis]
+            order = sorted(range(len(titles)), key=titles.__getitem__)
+            rank = np.empty(len(titles), dtype=np.int64)
+            current = -1
+            previous = None
+            for i in order:
+                if titles[i] != previous:
+                    current += 1
+                    previous = titles[i]
+                rank[i] = current
+            self._title_rank = rank
+        return self._title_rank
+    
+    def select(
+        self,
+        category: Optional[int] = None,
+        include_animated: bool = True,
+        adult_filter: bool = True,
+        min_favorites: Optional[int] = None
+    ) -> List[int]:
+        """
+        Get the positions of emojis matching the given criteria (see EmojiCatalog.select).
+        
+        Returns:
+            Matching positions in catalog order
+        """
+        mask = self.safe if adult_filter else self.quality
+        if category is not None:
+            if not isinstance(category, int):
+                return []
+            mask = mask & (self.category == category)
+        if not include_animated:
+            mask = mask & ~self.animated
+        if min_favorites is not None:
+            mask = mask & (self.faves >= min_favorites)
+        return np.flatnonzero(mask).tolist()
+    
+    def sort(self, positions: List[int], sort_by: str) -> Optional[List[int]]:
+        """
+        Sort positions by favorites (descending), title or recency (descending ID).
+        
+        Args:
+            positions: Catalog positions
+            sort_by: 'favorites', 'title' or 'recent'
+        
+        Returns:
+            Sorted positions (ties keep their input order), or None if the sort is not supported
+        """
+        index = np.asarray(positions, dtype=np.intp)
+        if sort_by == "favorites":
+            keys = -self.faves[index].astype(np.int64)
+        elif sort_by == "title":
+            keys = self._title_ranks()[index]
+        elif sort_by == "recent" and self.ids is not None:
+            keys = -self.ids[index]
+        else:
+            return None
+        return index[np.argsort(keys, kind="stable")].tolist()
+    
+    def top(self, positions: List[int], limit: int) -> List[int]:
+        """
+        Get the limit most favorited positions using a partial selection.
+        
+        Args:
+            positions: Candidate positions in catalog order
+            limit: Number of positions to return
+        
+        Returns:
+            Positions ordered by favorites (ties in input order)
+        """
+        index = np.asarray(positions, dtype=np.intp)
+        if limit >= len(index):
+            return self.sort(index, "favorites")
+        faves = self.faves[index]
+        # The limit-th largest value; everything above it is in, ties at it are taken in input order
+        threshold = np.partition(faves, len(faves) - limit)[len(faves) - limit]
+        above = faves > threshold
+        ties = np.flatnonzero(faves == threshold)[:limit - int(above.sum())]
+        chosen = np.sort(np.concatenate((np.flatnonzero(above), ties)))
+        return self.sort(index[chosen], "favorites")